@@ -1,6 +1,7 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import numpy as np
 import math  
+from geo_utils import DEG2M, haversine_rad_np, to_route
 
 class AirspaceCapacityAnalyzer:
     """基于论文的空域容量分析"""
@@ -9,6 +10,20 @@ class AirspaceCapacityAnalyzer:
         self.safety_separation = 50  # 米
         self.max_density = 10  # 架/平方公里
         
+        # 中国低空空域定义
+        self.AIRSPACE_LAYERS = {
+            "ultra_low": {"floor": 0, "ceiling": 120, "name": "超低空"},
+            "low_low": {"floor": 120, "ceiling": 300, "name": "低空下层"},
+            "low_mid": {"floor": 300, "ceiling": 600, "name": "低空中层"},
+            "low_high": {"floor": 600, "ceiling": 1000, "name": "低空上层"}
+        }
+        
+        # 安全间隔标准
+        self.SEPARATION_STANDARDS = {
+            "VFR": {"longitudinal": 100, "lateral": 50, "vertical": 30},
+            "IFR": {"longitudinal": 200, "lateral": 100, "vertical": 50}
+        }
+        
     def calculate_route_capacity(self, route: List[Dict], 
                                 route_width: float = 100) -> Dict:
         """计算航路容量"""
@@ -72,56 +87,296 @@ class AirspaceCapacityAnalyzer:
     
     def _calculate_route_length(self, route: List[Dict]) -> float:
         """计算航路总长度（米）"""
-        total_length = 0.0
+        waypoints = to_route(route)
+        if len(waypoints.lat) < 2:
+            return 0.0
         
-        for i in range(len(route) - 1):
-            # 使用Haversine公式计算距离
-            lat1, lon1 = route[i]["latitude"], route[i]["longitude"]
-            lat2, lon2 = route[i+1]["latitude"], route[i+1]["longitude"]
-            
-            distance = self._haversine_distance(lat1, lon1, lat2, lon2)
-            total_length += distance
-            
-        return total_length
+        # 弧度和纬度余弦已在转换时算好，一次向量化计算得到所有航段长度
+        distances = haversine_rad_np(
+            waypoints.lat_r[:-1], waypoints.lon_r[:-1], waypoints.cos_lat[:-1],
+            waypoints.lat_r[1:], waypoints.lon_r[1:], waypoints.cos_lat[1:]
+        )
+        
+        return float(distances.sum())
     
-    def _haversine_distance(self, lat1: float, lon1: float, 
-                           lat2: float, lon2: float) -> float:
-        """计算两点间距离（米）"""
-        R = 6371000  # 地球半径（米）
+    def _find_route_intersections(self, routes: List[List[Dict]]) -> List[Dict]:
+        """找出航路交叉点（航段与航段在局部平面内的几何相交）"""
+        soa_routes = [to_route(route) for route in routes]
+        if sum(len(route.lat) for route in soa_routes) == 0:
+            return []
         
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        delta_phi = math.radians(lat2 - lat1)
-        delta_lambda = math.radians(lon2 - lon1)
+        # 以所有航路点的中心为原点投影到局部平面（米）
+        lat0 = float(np.concatenate([route.lat for route in soa_routes]).mean())
+        lon0 = float(np.concatenate([route.lon for route in soa_routes]).mean())
+        kx = DEG2M * math.cos(math.radians(lat0))
         
-        a = math.sin(delta_phi/2)**2 + \
-            math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        # 每条航路的航段端点数组 (x1, y1, x2, y2)
+        segments = []
+        for route in soa_routes:
+            x = (route.lon - lon0) * kx
+            y = (route.lat - lat0) * DEG2M
+            segments.append((x[:-1], y[:-1], x[1:], y[1:]))
         
-        return R * c
-    
-    def _find_route_intersections(self, routes: List[List[Dict]]) -> List[Dict]:
-        """找出航路交叉点（简化版）"""
         intersections = []
-        
-        # 简化处理：检查航路点是否接近
         for i in range(len(routes)):
             for j in range(i + 1, len(routes)):
-                for point1 in routes[i]:
-                    for point2 in routes[j]:
-                        # 如果两点距离小于100米，认为是交叉点
-                        distance = self._haversine_distance(
-                            point1["latitude"], point1["longitude"],
-                            point2["latitude"], point2["longitude"]
-                        )
-                        if distance < 100:
-                            intersections.append({
-                                "route1": i,
-                                "route2": j,
-                                "location": {
-                                    "longitude": (point1["longitude"] + point2["longitude"]) / 2,
-                                    "latitude": (point1["latitude"] + point2["latitude"]) / 2
-                                }
-                            })
+                for x, y in self._segment_intersections(segments[i], segments[j]):
+                    intersections.append({
+                        "route1": i,
+                        "route2": j,
+                        "location": {
+                            "longitude": lon0 + x / kx,
+                            "latitude": lat0 + y / DEG2M
+                        }
+                    })
         
         return intersections
+    
+    def _segment_intersections(self, segments1: Tuple[np.ndarray, ...],
+                               segments2: Tuple[np.ndarray, ...]) -> List[Tuple[float, float]]:
+        """计算两组航段的所有交点（局部平面坐标），共线重叠时取重叠部分中点"""
+        ax1, ay1, ax2, ay2 = segments1
+        bx1, by1, bx2, by2 = segments2
+        if len(ax1) == 0 or len(bx1) == 0:
+            return []
+        
+        # 包围盒预筛：只保留包围盒相交的航段对
+        overlap = (
+            (np.minimum(ax1, ax2)[:, None] <= np.maximum(bx1, bx2)[None, :]) &
+            (np.maximum(ax1, ax2)[:, None] >= np.minimum(bx1, bx2)[None, :]) &
+            (np.minimum(ay1, ay2)[:, None] <= np.maximum(by1, by2)[None, :]) &
+            (np.maximum(ay1, ay2)[:, None] >= np.minimum(by1, by2)[None, :])
+        )
+        ia, ib = np.nonzero(overlap)
+        
+        # 参数方程 p + t·r 与 q + u·s 求交
+        px, py = ax1[ia], ay1[ia]
+        rx, ry = ax2[ia] - px, ay2[ia] - py
+        qpx, qpy = bx1[ib] - px, by1[ib] - py
+        sx, sy = bx2[ib] - bx1[ib], by2[ib] - by1[ib]
+        
+        denom = rx * sy - ry * sx
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (qpx * sy - qpy * sx) / denom
+            u = (qpx * ry - qpy * rx) / denom
+        crossing = (denom != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        t_hit = np.where(crossing, t, 0.0)
+        
+        # 平行航段：判断是否共线并在 r 方向上有重叠
+        rr = rx * rx + ry * ry
+        with np.errstate(divide="ignore", invalid="ignore"):
+            offset = np.abs(qpx * ry - qpy * rx) / np.sqrt(rr)
+            t0 = (qpx * rx + qpy * ry) / rr
+            t1 = t0 + (sx * rx + sy * ry) / rr
+        low = np.maximum(np.minimum(t0, t1), 0.0)
+        high = np.minimum(np.maximum(t0, t1), 1.0)
+        collinear = (denom == 0) & (rr > 0) & (offset < 1e-6) & (low <= high)
+        t_hit = np.where(collinear, (low + high) / 2, t_hit)
+        
+        hit = crossing | collinear
+        points = np.column_stack((px[hit] + t_hit[hit] * rx[hit],
+                                  py[hit] + t_hit[hit] * ry[hit]))
+        if len(points) == 0:
+            return []
+        
+        # 交点落在共享航路点上时相邻航段会重复命中，按0.1米精度去重并保持顺序
+        _, first = np.unique(np.round(points, 1), axis=0, return_index=True)
+        return [tuple(point) for point in points[np.sort(first)].tolist()]
+    
+    def calculate_capacity(self, airspace_params: Dict) -> Dict:
+        """计算空域容量"""
+        length = airspace_params.get('length', 10000)  # 默认10km
+        width = airspace_params.get('width', 2000)     # 默认2km
+        height_range = airspace_params.get('height_range', (120, 300))  # 默认高度层
+        flight_rules = airspace_params.get('flight_rules', 'VFR')
+        
+        # 获取间隔标准
+        separation = self.SEPARATION_STANDARDS[flight_rules]
+        
+        # 1. 计算物理容量
+        physical_capacity = self._calculate_physical_capacity(
+            length, width, height_range, separation
+        )
+        
+        # 2. 计算运行容量（考虑实际约束）
+        operational_capacity = self._calculate_operational_capacity(
+            physical_capacity, airspace_params
+        )
+        
+        # 3. 计算动态容量（考虑流量）
+        dynamic_capacity = self._calculate_dynamic_capacity(
+            operational_capacity, length, airspace_params.get('avg_speed', 50)
+        )
+        
+        return {
+            "physical_capacity": physical_capacity,
+            "operational_capacity": operational_capacity,
+            "dynamic_capacity": dynamic_capacity,
+            "utilization_factors": self._get_utilization_factors(airspace_params),
+            "recommendations": self._generate_recommendations(dynamic_capacity)
+        }
+    
+    def _calculate_physical_capacity(self, length: float, width: float, 
+                                   height_range: Tuple[float, float], 
+                                   separation: Dict) -> Dict:
+        """计算物理容量"""
+        # 纵向容量
+        aircraft_length = 10  # 假设无人机长度10米
+        longitudinal_capacity = int(length / (separation['longitudinal'] + aircraft_length))
+        
+        # 横向容量
+        lateral_capacity = max(1, int(width / separation['lateral']))
+        
+        # 垂直容量
+        height_diff = height_range[1] - height_range[0]
+        vertical_capacity = max(1, int(height_diff / separation['vertical']))
+        
+        # 总容量
+        total_capacity = longitudinal_capacity * lateral_capacity * vertical_capacity
+        
+        return {
+            "total": total_capacity,
+            "longitudinal": longitudinal_capacity,
+            "lateral": lateral_capacity,
+            "vertical": vertical_capacity,
+            "dimensions": {
+                "length": length,
+                "width": width,
+                "height": height_diff
+            }
+        }
+    
+    def _calculate_operational_capacity(self, physical_capacity: Dict, 
+                                      params: Dict) -> Dict:
+        """计算运行容量"""
+        # 基础容量
+        base_capacity = physical_capacity['total']
+        
+        # 应用各种约束因子
+        controller_factor = params.get('controller_workload_factor', 0.7)
+        weather_factor = params.get('weather_factor', 0.85)
+        equipment_factor = params.get('equipment_factor', 0.9)
+        
+        # 运行容量
+        operational = int(base_capacity * controller_factor * weather_factor * equipment_factor)
+        
+        return {
+            "capacity": operational,
+            "reduction_rate": 1 - (operational / base_capacity),
+            "limiting_factors": {
+                "controller_workload": controller_factor,
+                "weather": weather_factor,
+                "equipment": equipment_factor
+            }
+        }
+    
+    def _calculate_dynamic_capacity(self, operational_capacity: Dict, 
+                                  route_length: float, avg_speed: float) -> Dict:
+        """计算动态容量（流量）"""
+        capacity = operational_capacity['capacity']
+        
+        # 飞行时间（小时）
+        flight_time = (route_length / 1000) / avg_speed
+        
+        # 小时流量
+        hourly_flow = int(capacity / flight_time) if flight_time > 0 else 0
+        
+        # 15分钟流量（用于短期调度）
+        quarter_flow = int(hourly_flow / 4)
+        
+        return {
+            "hourly_flow": hourly_flow,
+            "quarter_flow": quarter_flow,
+            "avg_separation_time": (3600 / hourly_flow) if hourly_flow > 0 else 0,
+            "flight_time_minutes": flight_time * 60
+        }
+    
+    def analyze_layer_capacity(self, layer_name: str, area_params: Dict) -> Dict:
+        """分析特定高度层的容量"""
+        if layer_name not in self.AIRSPACE_LAYERS:
+            return {"error": "Invalid layer name"}
+            
+        layer = self.AIRSPACE_LAYERS[layer_name]
+        
+        # 设置该层的参数
+        params = area_params.copy()
+        params['height_range'] = (layer['floor'], layer['ceiling'])
+        
+        # 计算容量
+        capacity = self.calculate_capacity(params)
+        
+        # 添加层特定信息
+        capacity['layer_info'] = {
+            "name": layer['name'],
+            "altitude_range": f"{layer['floor']}-{layer['ceiling']}m",
+            "typical_operations": self._get_layer_operations(layer_name)
+        }
+        
+        return capacity
+    
+    def _get_layer_operations(self, layer_name: str) -> List[str]:
+        """获取高度层典型运行类型"""
+        operations = {
+            "ultra_low": ["设施巡检", "航拍摄影", "农业植保"],
+            "low_low": ["物流配送", "应急救援", "城市监测"],
+            "low_mid": ["区域运输", "客运飞行", "测绘作业"],
+            "low_high": ["城际运输", "通用航空", "科研飞行"]
+        }
+        return operations.get(layer_name, [])
+    
+    def _get_utilization_factors(self, params: Dict) -> Dict:
+        """获取利用率因子"""
+        return {
+            "time_of_day": self._get_time_factor(params.get('hour', 12)),
+            "day_of_week": self._get_day_factor(params.get('weekday', 3)),
+            "season": self._get_season_factor(params.get('month', 6)),
+            "demand_level": params.get('demand_level', 0.6)
+        }
+    
+    def _get_time_factor(self, hour: int) -> float:
+        """根据时间获取利用率因子"""
+        # 高峰时段
+        if 7 <= hour <= 9 or 17 <= hour <= 19:
+            return 0.9
+        # 日间
+        elif 9 <= hour <= 17:
+            return 0.7
+        # 夜间
+        else:
+            return 0.3
+            
+    def _get_day_factor(self, weekday: int) -> float:
+        """根据星期获取利用率因子"""
+        # 周一到周五
+        if weekday < 5:
+            return 0.8
+        # 周末
+        else:
+            return 0.5
+            
+    def _get_season_factor(self, month: int) -> float:
+        """根据季节获取利用率因子"""
+        # 春秋季
+        if month in [3, 4, 5, 9, 10, 11]:
+            return 0.9
+        # 夏季
+        elif month in [6, 7, 8]:
+            return 0.8
+        # 冬季
+        else:
+            return 0.7
+    
+    def _generate_recommendations(self, dynamic_capacity: Dict) -> List[str]:
+        """生成容量优化建议"""
+        recommendations = []
+        
+        if dynamic_capacity['hourly_flow'] < 20:
+            recommendations.append("当前容量较低，建议优化空域结构或放宽间隔标准")
+        
+        if dynamic_capacity['avg_separation_time'] < 60:
+            recommendations.append("平均间隔时间较短，建议加强冲突监测")
+            
+        if dynamic_capacity['flight_time_minutes'] > 30:
+            recommendations.append("航路较长，建议设置中间监控点")
+            
+        return recommendations
@@ -13,6 +13,15 @@ matplotlib.rcParams['font.sans-serif'] = ['DejaVu Sans']
 matplotlib.rcParams['axes.unicode_minus'] = False
 
 from datetime import datetime, timedelta
+from collections import defaultdict
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # 未安装scipy时退化为时间分桶筛选
+    cKDTree = None
+
+from geo_utils import (DEG2M, haversine_cached, equirect_distance2_np,
+                       point_to_segment_distance2_np, to_route)
 
 class EnhancedRouteAnalyzer:
     """
@@ -24,6 +33,10 @@ class EnhancedRouteAnalyzer:
         self.REFERENCE_DISTANCE = 1  # 1米参考距离
         self.SAFETY_SEPARATION = 50  # 50米安全间隔
         self.GROUND_EFFECT_THRESHOLD = 100  # 100米以下考虑地面效应
+        self.TIME_WINDOW = 60  # 60秒内认为是同一时间窗口
+        
+        # 冲突严重程度，按编码 0..3 由低到高排列
+        self.SEVERITY_LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
         
     def calculate_collision_risk(self, point1: Dict, point2: Dict, 
                                 obstacles: List[Dict]) -> Dict:
@@ -54,13 +67,20 @@ class EnhancedRouteAnalyzer:
         # 航段越长，潜在碰撞风险越高
         length_risk = min(segment_length / 5000, 0.3)  # 5km以上风险达到最大
         
-        # 3. 障碍物风险
+        # 3. 障碍物风险（一次向量化计算所有障碍物到航段的距离）
         obstacle_risk = 0.0
-        for obstacle in obstacles:
-            distance = self._point_to_line_distance(obstacle, point1, point2)
-            if distance < self.SAFETY_SEPARATION:
-                # 距离越近，风险越高
-                obstacle_risk += (1 - distance / self.SAFETY_SEPARATION) * 0.2
+        if obstacles:
+            obstacle_lats, obstacle_lons = self._obstacle_arrays(obstacles)
+            distances2 = point_to_segment_distance2_np(
+                obstacle_lats, obstacle_lons,
+                point1["latitude"], point1["longitude"],
+                point2["latitude"], point2["longitude"]
+            )
+            # 先用距离平方排除安全间隔外的障碍物，只对剩余的开方；距离越近，风险越高
+            near = distances2[distances2 < self.SAFETY_SEPARATION ** 2]
+            obstacle_risk = float(
+                (1 - np.sqrt(near) / self.SAFETY_SEPARATION).sum()
+            ) * 0.2
                 
         # 4. 总风险计算
         total_risk = height_risk * 0.4 + length_risk * 0.3 + obstacle_risk * 0.3
@@ -125,78 +145,172 @@ class EnhancedRouteAnalyzer:
         分析多条航路之间的冲突
         基于论文第3.2节的空域结构分析
         """
-        conflicts = []
+        return self.analyze_route_conflicts_batch([routes])[0]
+    
+    def analyze_route_conflicts_batch(self, route_sets: List[List[Dict]]) -> List[Dict]:
+        """
+        批量分析多个场景的航路冲突
+        所有场景的航路点合并为一个数组结构，一次预筛候选点对后按场景拆分结果
+        """
+        conflicts = [[] for _ in route_sets]
+        severity_codes = [np.empty(0, dtype=np.int64) for _ in route_sets]
         
-        for i in range(len(routes)):
-            for j in range(i + 1, len(routes)):
-                route1 = routes[i]["path"]
-                route2 = routes[j]["path"]
-                
-                # 检查时空冲突
-                for k1, point1 in enumerate(route1):
-                    for k2, point2 in enumerate(route2):
-                        # 检查是否在相同时间窗口
-                        time_diff = abs(point1["time"] - point2["time"])
-                        
-                        if time_diff < 60:  # 60秒内认为是同一时间窗口
-                            # 计算空间距离
-                            horizontal_distance = self._haversine_distance(
-                                point1["latitude"], point1["longitude"],
-                                point2["latitude"], point2["longitude"]
-                            )
-                            
-                            vertical_distance = abs(point1["height"] - point2["height"])
-                            
-                            # 3D距离
-                            total_distance = math.sqrt(
-                                horizontal_distance**2 + vertical_distance**2
-                            )
-                            
-                            # 如果距离小于安全间隔，记录冲突
-                            if total_distance < self.SAFETY_SEPARATION:
-                                conflicts.append({
-                                    "route1": routes[i]["name"],
-                                    "route2": routes[j]["name"],
-                                    "point1_index": k1,
-                                    "point2_index": k2,
-                                    "time": point1["time"],
-                                    "distance": total_distance,
-                                    "location": {
-                                        "longitude": (point1["longitude"] + point2["longitude"]) / 2,
-                                        "latitude": (point1["latitude"] + point2["latitude"]) / 2,
-                                        "height": (point1["height"] + point2["height"]) / 2
-                                    },
-                                    "severity": self._calculate_conflict_severity(
-                                        total_distance, time_diff
-                                    )
-                                })
+        # 展平所有场景的航路点为数组，记录所属航路（全局编号）、场景及点序号
+        routes = [route for route_set in route_sets for route in route_set]
+        soa_routes = [to_route(route) for route in routes]
+        counts = [len(route.t) for route in soa_routes]
+        route_scenarios = np.repeat(np.arange(len(route_sets)),
+                                    [len(route_set) for route_set in route_sets])
+        if sum(counts) > 0:
+            route_ids = np.repeat(np.arange(len(routes)), counts)
+            point_ids = np.concatenate([np.arange(count) for count in counts])
+            lats = np.concatenate([route.lat for route in soa_routes])
+            lons = np.concatenate([route.lon for route in soa_routes])
+            heights = np.concatenate([route.h for route in soa_routes])
+            times = np.concatenate([route.t for route in soa_routes])
+            
+            # 用KD树（或时间分桶）预筛候选点对，只保留同一场景内的点对，再检查是否在同一时间窗口
+            if cKDTree is not None:
+                rows, cols = self._spatial_pairs(lats, lons, heights, times, route_ids)
+            else:
+                rows, cols = self._time_window_pairs(times, route_ids)
+            same_scenario = route_scenarios[route_ids[rows]] == route_scenarios[route_ids[cols]]
+            rows, cols = rows[same_scenario], cols[same_scenario]
+            time_diff = np.abs(times[rows] - times[cols])
+            in_window = time_diff < self.TIME_WINDOW
+            rows, cols, time_diff = rows[in_window], cols[in_window], time_diff[in_window]
+            
+            # 只对同一时间窗口内的点对计算3D距离的平方
+            horizontal_distance2 = equirect_distance2_np(lats[rows], lons[rows], lats[cols], lons[cols])
+            vertical_distance = heights[rows] - heights[cols]
+            total_distance2 = horizontal_distance2 + vertical_distance**2
+            
+            # 如果距离小于安全间隔，记录冲突（只对冲突点对开方）；
+            # 全局航路编号随场景递增，按 (航路i, 航路j, 点i, 点j) 排序即按场景分组输出
+            hit = total_distance2 < self.SAFETY_SEPARATION ** 2
+            rows, cols = rows[hit], cols[hit]
+            total_distance, time_diff = np.sqrt(total_distance2[hit]), time_diff[hit]
+            order = np.lexsort((point_ids[cols], point_ids[rows], route_ids[cols], route_ids[rows]))
+            rows, cols, total_distance = rows[order], cols[order], total_distance[order]
+            codes = self._conflict_severity_codes(total_distance, time_diff[order])
+            scenarios = route_scenarios[route_ids[rows]]
+            
+            for k, (code, scenario) in enumerate(zip(codes.tolist(), scenarios.tolist())):
+                i, j = int(route_ids[rows[k]]), int(route_ids[cols[k]])
+                k1, k2 = int(point_ids[rows[k]]), int(point_ids[cols[k]])
+                point1, point2 = routes[i]["path"][k1], routes[j]["path"][k2]
+                conflicts[scenario].append({
+                    "route1": routes[i]["name"],
+                    "route2": routes[j]["name"],
+                    "point1_index": k1,
+                    "point2_index": k2,
+                    "time": point1["time"],
+                    "distance": float(total_distance[k]),
+                    "location": {
+                        "longitude": (point1["longitude"] + point2["longitude"]) / 2,
+                        "latitude": (point1["latitude"] + point2["latitude"]) / 2,
+                        "height": (point1["height"] + point2["height"]) / 2
+                    },
+                    "severity": self.SEVERITY_LEVELS[code]
+                })
+            
+            # 按场景拆分严重程度编码
+            bounds = np.searchsorted(scenarios, np.arange(len(route_sets) + 1))
+            severity_codes = [codes[bounds[n]:bounds[n + 1]] for n in range(len(route_sets))]
         
-        return {
-            "total_conflicts": len(conflicts),
-            "conflicts": conflicts,
-            "risk_assessment": self._assess_overall_risk(conflicts)
-        }
+        return [
+            {
+                "total_conflicts": len(scenario_conflicts),
+                "conflicts": scenario_conflicts,
+                "risk_assessment": self._assess_overall_risk(scenario_codes)
+            }
+            for scenario_conflicts, scenario_codes in zip(conflicts, severity_codes)
+        ]
     
-    def _calculate_conflict_severity(self, distance: float, time_diff: float) -> str:
-        """计算冲突严重程度"""
-        if distance < 20 and time_diff < 10:
-            return "CRITICAL"
-        elif distance < 30 and time_diff < 30:
-            return "HIGH"
-        elif distance < 40 and time_diff < 45:
-            return "MEDIUM"
-        else:
-            return "LOW"
+    def _spatial_pairs(self, lats: np.ndarray, lons: np.ndarray, heights: np.ndarray,
+                       times: np.ndarray, route_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        基于cKDTree的固定半径近邻查询生成不同航路间的候选点对（航路编号小者在前）
+        点坐标为局部平面米制 (x, y, z) 加上按 安全间隔/时间窗口 缩放的时间维，
+        冲突点对（3D距离 < 间隔且时间差 < 窗口）在该4D空间中的距离必小于 √2 倍间隔
+        """
+        valid = np.nonzero(np.isfinite(heights) & np.isfinite(times))[0]
+        if len(valid) < 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        lat0 = float(lats[valid].mean())
+        points = np.column_stack((
+            (lons[valid] - lons[valid].mean()) * DEG2M * math.cos(math.radians(lat0)),
+            (lats[valid] - lat0) * DEG2M,
+            heights[valid],
+            times[valid] * (self.SAFETY_SEPARATION / self.TIME_WINDOW)
+        ))
+        
+        # 半径留5%余量，覆盖局部投影与精确距离之间的误差
+        radius = self.SAFETY_SEPARATION * math.sqrt(2) * 1.05
+        pairs = cKDTree(points).query_pairs(radius, output_type='ndarray')
+        p, q = valid[pairs[:, 0]], valid[pairs[:, 1]]
+        
+        different = route_ids[p] != route_ids[q]
+        p, q = p[different], q[different]
+        swap = route_ids[p] > route_ids[q]
+        return np.where(swap, q, p), np.where(swap, p, q)
+    
+    def _time_window_pairs(self, times: np.ndarray,
+                           route_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        按时间窗口分桶生成不同航路间的候选点对（航路编号小者在前）
+        时间差小于窗口的点对只可能位于同一桶或相邻桶
+        """
+        valid = np.nonzero(np.isfinite(times))[0]
+        bins = np.floor(times[valid] / self.TIME_WINDOW).astype(np.int64)
+        buckets = defaultdict(list)
+        for idx, b in zip(valid.tolist(), bins.tolist()):
+            buckets[b].append(idx)
+        buckets = {b: np.array(members) for b, members in buckets.items()}
+        
+        rows, cols = [], []
+        for b, members in buckets.items():
+            # 同一桶内的点对
+            member_routes = route_ids[members]
+            r, c = np.nonzero(member_routes[:, None] < member_routes[None, :])
+            rows.append(members[r])
+            cols.append(members[c])
+            
+            # 与下一个桶的点对
+            following = buckets.get(b + 1)
+            if following is not None:
+                r, c = np.nonzero(member_routes[:, None] != route_ids[following][None, :])
+                p, q = members[r], following[c]
+                swap = route_ids[p] > route_ids[q]
+                rows.append(np.where(swap, q, p))
+                cols.append(np.where(swap, p, q))
+        
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+    
+    def _conflict_severity_codes(self, distances: np.ndarray, time_diffs: np.ndarray) -> np.ndarray:
+        """批量计算冲突严重程度编码（0=LOW, 1=MEDIUM, 2=HIGH, 3=CRITICAL）"""
+        return np.select(
+            [(distances < 20) & (time_diffs < 10),
+             (distances < 30) & (time_diffs < 30),
+             (distances < 40) & (time_diffs < 45)],
+            [3, 2, 1],
+            default=0
+        )
             
-    def _assess_overall_risk(self, conflicts: List[Dict]) -> Dict:
+    def _assess_overall_risk(self, severity_codes: np.ndarray) -> Dict:
         """评估整体风险水平"""
-        if not conflicts:
+        if len(severity_codes) == 0:
             return {"level": "SAFE", "score": 0}
             
-        critical_count = sum(1 for c in conflicts if c["severity"] == "CRITICAL")
-        high_count = sum(1 for c in conflicts if c["severity"] == "HIGH")
+        # 一次bincount统计各严重程度的冲突数量
+        counts = np.bincount(severity_codes, minlength=len(self.SEVERITY_LEVELS))
+        critical_count = int(counts[3])
+        high_count = int(counts[2])
         
-        risk_score = critical_count * 10 + high_count * 5 + len(conflicts)
+        risk_score = critical_count * 10 + high_count * 5 + len(severity_codes)
         
         if risk_score > 50:
             level = "UNACCEPTABLE"
@@ -226,33 +340,14 @@ class EnhancedRouteAnalyzer:
     def _haversine_distance(self, lat1: float, lon1: float, 
                            lat2: float, lon2: float) -> float:
         """Haversine公式计算距离"""
-        R = 6371000
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        delta_phi = math.radians(lat2 - lat1)
-        delta_lambda = math.radians(lon2 - lon1)
-        
-        a = math.sin(delta_phi/2)**2 + \
-            math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
+        return haversine_cached(lat1, lon1, lat2, lon2)
     
-    def _point_to_line_distance(self, point: Dict, line_start: Dict, 
-                               line_end: Dict) -> float:
-        """计算点到线段的距离"""
-        # 简化计算
-        dist_to_start = self._haversine_distance(
-            point.get("latitude", 0), point.get("longitude", 0),
-            line_start["latitude"], line_start["longitude"]
-        )
-        
-        dist_to_end = self._haversine_distance(
-            point.get("latitude", 0), point.get("longitude", 0),
-            line_end["latitude"], line_end["longitude"]
-        )
-        
-        return min(dist_to_start, dist_to_end)
+    def _obstacle_arrays(self, obstacles: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """障碍物坐标转换为 (纬度数组, 经度数组)，每次调用按当前内容重新转换"""
+        count = len(obstacles)
+        lats = np.fromiter((o.get("latitude", 0) for o in obstacles), dtype=np.float64, count=count)
+        lons = np.fromiter((o.get("longitude", 0) for o in obstacles), dtype=np.float64, count=count)
+        return lats, lons
 
 
 # 测试用例：设计有冲突隐患的航线
@@ -494,11 +589,20 @@ if __name__ == "__main__":
     analyzer = EnhancedRouteAnalyzer()
     scenarios = ConflictTestScenarios()
     
-    # 测试1：交叉航线冲突分析
-    print("\n=== Test 1: Crossing Routes Conflict Analysis ===")
+    # 所有冲突场景一次批量分析
     crossing_routes = scenarios.get_crossing_routes()
-    crossing_conflicts = analyzer.analyze_route_conflicts(crossing_routes)
+    parallel_routes = scenarios.get_parallel_routes()
+    vertical_routes = scenarios.get_vertical_conflict_routes()
+    complex_routes = scenarios.get_complex_scenario()
+    high_conflict_routes = scenarios.get_high_conflict_scenario()
+    (crossing_conflicts, parallel_conflicts, vertical_conflicts,
+     complex_conflicts, high_conflicts) = analyzer.analyze_route_conflicts_batch([
+        crossing_routes, parallel_routes, vertical_routes,
+        complex_routes, high_conflict_routes
+    ])
     
+    # 测试1：交叉航线冲突分析
+    print("\n=== Test 1: Crossing Routes Conflict Analysis ===")
     print(f"Found {crossing_conflicts['total_conflicts']} conflicts")
     for conflict in crossing_conflicts['conflicts']:
         print(f"- {conflict['route1']} vs {conflict['route2']} at time {conflict['time']}s")
@@ -512,21 +616,14 @@ if __name__ == "__main__":
     
     # 测试2：平行航线分析
     print("\n=== Test 2: Parallel Routes Analysis ===")
-    parallel_routes = scenarios.get_parallel_routes()
-    parallel_conflicts = analyzer.analyze_route_conflicts(parallel_routes)
     print(f"Parallel route conflicts: {parallel_conflicts['total_conflicts']}")
     
     # 测试3：垂直分层分析
     print("\n=== Test 3: Vertical Separation Analysis ===")
-    vertical_routes = scenarios.get_vertical_conflict_routes()
-    vertical_conflicts = analyzer.analyze_route_conflicts(vertical_routes)
     print(f"Vertical separation conflicts: {vertical_conflicts['total_conflicts']}")
     
     # 测试4：复杂场景分析
     print("\n=== Test 4: Complex Scenario Analysis ===")
-    complex_routes = scenarios.get_complex_scenario()
-    complex_conflicts = analyzer.analyze_route_conflicts(complex_routes)
-    
     print(f"Complex scenario conflicts: {complex_conflicts['total_conflicts']}")
     print(f"Risk assessment: {complex_conflicts['risk_assessment']}")
     
@@ -551,9 +648,6 @@ if __name__ == "__main__":
     
     # 测试6：高冲突场景测试
     print("\n=== Test 6: High Conflict Scenario ===")
-    high_conflict_routes = scenarios.get_high_conflict_scenario()
-    high_conflicts = analyzer.analyze_route_conflicts(high_conflict_routes)
-    
     print(f"High conflict scenario results:")
     print(f"  - Total conflicts: {high_conflicts['total_conflicts']}")
     print(f"  - Risk level: {high_conflicts['risk_assessment']['level']}")
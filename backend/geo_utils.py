@@ -0,0 +1,233 @@
+# geo_utils.py
+"""
+航路分析公用的地理距离计算函数
+
+安装了numba时使用JIT编译的内核，否则退化为等价的纯Python/NumPy实现。
+"""
+
+import math
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+
+try:
+    from numba import njit, prange
+    from numba.core import config as numba_config
+    NUMBA_AVAILABLE = True
+    # fastmath内核中的超越函数能否由Intel SVML向量化，取决于环境中是否装有 icc_rt
+    SVML_AVAILABLE = bool(numba_config.USING_SVML)
+except ImportError:  # 未安装numba时保持原有的解释执行
+    NUMBA_AVAILABLE = False
+    SVML_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """numba.njit 的占位装饰器，直接返回原函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+def vector_math_info() -> dict:
+    """当前环境的向量化数学库信息：numba/SVML 是否可用及NumPy链接的BLAS（如MKL、OpenBLAS）"""
+    blas = None
+    try:
+        blas = np.show_config(mode="dicts")["Build Dependencies"]["blas"]["name"]
+    except (TypeError, KeyError):  # 旧版NumPy的show_config只能打印
+        pass
+    return {"numba": NUMBA_AVAILABLE, "svml": SVML_AVAILABLE, "blas": blas}
+
+
+# 航路点的结构化数组类型：经度、纬度、高度（米）、时间（秒）
+WAYPOINT_DTYPE = np.dtype([("lon", "f8"), ("lat", "f8"), ("h", "f8"), ("t", "f8")])
+
+# 航路的数组结构（SoA）：航路点坐标按列存放为连续数组，
+# 并预先换算弧度与纬度余弦，供Haversine计算直接复用
+Route = namedtuple("Route", "name lat lon h t lat_r lon_r cos_lat")
+
+EARTH_RADIUS = 6371000  # 地球半径（米）
+DEG2M = EARTH_RADIUS * math.pi / 180  # 每度弧长（米）
+
+# 等距圆柱投影近似：以广州市区纬度为参考，城市尺度内误差在亚米级
+REFERENCE_LATITUDE = 23.12
+COS_LAT0 = math.cos(math.radians(REFERENCE_LATITUDE))
+DEG2M_LON = DEG2M * COS_LAT0  # 参考纬度处每度经度弧长（米），经度差乘以它即为东西向距离
+EQUIRECT_MAX_DEG = 0.5  # 超出该范围时回退到Haversine
+
+
+@njit(cache=True, fastmath=True)
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Haversine公式计算两点间距离（米）"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    return haversine_rad_m(phi1, math.radians(lon1), math.cos(phi1),
+                           phi2, math.radians(lon2), math.cos(phi2))
+
+
+@njit(cache=True, fastmath=True)
+def haversine_rad_m(lat1_r, lon1_r, cos_lat1, lat2_r, lon2_r, cos_lat2):
+    """Haversine距离（米），输入为预先换算的弧度及纬度余弦，循环内不再做角度换算"""
+    a = math.sin((lat2_r - lat1_r) / 2) ** 2 + \
+        cos_lat1 * cos_lat2 * math.sin((lon2_r - lon1_r) / 2) ** 2
+    c = 2 * math.asin(math.sqrt(min(a, 1.0)))
+
+    return EARTH_RADIUS * c
+
+
+@lru_cache(maxsize=65536)
+def haversine_cached(lat1, lon1, lat2, lon2):
+    """带LRU缓存的Haversine距离（米），重复出现的坐标对直接命中缓存"""
+    return haversine_m(lat1, lon1, lat2, lon2)
+
+
+@njit(cache=True, fastmath=True)
+def equirect_distance_m(lat1, lon1, lat2, lon2):
+    """等距圆柱投影近似计算两点间距离（米），适用于小范围邻域"""
+    if (abs(lat2 - lat1) > EQUIRECT_MAX_DEG or abs(lon2 - lon1) > EQUIRECT_MAX_DEG or
+            abs(lat1 - REFERENCE_LATITUDE) > EQUIRECT_MAX_DEG):
+        return haversine_m(lat1, lon1, lat2, lon2)
+
+    dx = (lon2 - lon1) * DEG2M_LON
+    dy = (lat2 - lat1) * DEG2M
+    return math.sqrt(dx * dx + dy * dy)
+
+
+def planar_distance(lat1, lon1, lat2, lon2, cos_lat0):
+    """等距圆柱投影下两点间距离（米），cos_lat0 为调用方预先计算的参考纬度余弦"""
+    return DEG2M * math.hypot((lon2 - lon1) * cos_lat0, lat2 - lat1)
+
+
+def planar_distance_np(lat1, lon1, lat2, lon2, cos_lat0) -> np.ndarray:
+    """向量化的等距圆柱投影距离（米），输入按NumPy规则广播"""
+    return DEG2M * np.hypot((np.asarray(lon2) - lon1) * cos_lat0, np.asarray(lat2) - lat1)
+
+
+@njit(cache=True, fastmath=True)
+def point_to_segment_distance_m(lat, lon, lat1, lon1, lat2, lon2):
+    """点到线段的最短距离（米）：投影到局部平面后求垂足并限制在线段内"""
+    vx = (lon2 - lon1) * DEG2M_LON
+    vy = (lat2 - lat1) * DEG2M
+    wx = (lon - lon1) * DEG2M_LON
+    wy = (lat - lat1) * DEG2M
+
+    seg_len2 = vx * vx + vy * vy
+    t = 0.0
+    if seg_len2 > 0:
+        t = min(max((vx * wx + vy * wy) / seg_len2, 0.0), 1.0)
+
+    dx = wx - t * vx
+    dy = wy - t * vy
+    return math.sqrt(dx * dx + dy * dy)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _haversine_pairs(lat1, lon1, lat2, lon2, out):
+    """逐对计算距离并写入out（多线程）"""
+    for k in prange(out.shape[0]):
+        out[k] = haversine_m(lat1[k], lon1[k], lat2[k], lon2[k])
+
+
+def haversine_np(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """向量化计算两组点间距离（米），输入按NumPy规则广播"""
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lat1, lon1, lat2, lon2))
+    )
+
+    if NUMBA_AVAILABLE and lat1.ndim == 1:
+        out = np.empty(lat1.shape[0])
+        _haversine_pairs(np.ascontiguousarray(lat1), np.ascontiguousarray(lon1),
+                         np.ascontiguousarray(lat2), np.ascontiguousarray(lon2), out)
+        return out
+
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    return haversine_rad_np(phi1, np.radians(lon1), np.cos(phi1),
+                            phi2, np.radians(lon2), np.cos(phi2))
+
+
+def haversine_rad_np(lat1_r, lon1_r, cos_lat1, lat2_r, lon2_r, cos_lat2) -> np.ndarray:
+    """向量化Haversine距离（米），输入为预先换算的弧度及纬度余弦"""
+    a = np.sin((lat2_r - lat1_r) / 2) ** 2 + \
+        cos_lat1 * cos_lat2 * np.sin((lon2_r - lon1_r) / 2) ** 2
+
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def equirect_distance_np(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """向量化的等距圆柱投影近似距离（米），远距离点对回退到Haversine"""
+    return np.sqrt(equirect_distance2_np(lat1, lon1, lat2, lon2))
+
+
+def equirect_distance2_np(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """等距圆柱投影近似距离的平方（平方米），用于与阈值平方比较以省去开方"""
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lat1, lon1, lat2, lon2))
+    )
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    dx = dlon * DEG2M_LON
+    dy = dlat * DEG2M
+    distance2 = dx * dx + dy * dy
+
+    far = ((np.abs(dlat) > EQUIRECT_MAX_DEG) | (np.abs(dlon) > EQUIRECT_MAX_DEG) |
+           (np.abs(lat1 - REFERENCE_LATITUDE) > EQUIRECT_MAX_DEG))
+    if far.any():
+        distance2[far] = haversine_np(lat1[far], lon1[far], lat2[far], lon2[far]) ** 2
+
+    return distance2
+
+
+def point_to_segment_distance_np(lat, lon, lat1, lon1, lat2, lon2) -> np.ndarray:
+    """向量化的点到线段最短距离（米），输入按NumPy规则广播"""
+    return np.sqrt(point_to_segment_distance2_np(lat, lon, lat1, lon1, lat2, lon2))
+
+
+def point_to_segment_distance2_np(lat, lon, lat1, lon1, lat2, lon2) -> np.ndarray:
+    """点到线段最短距离的平方（平方米），用于与阈值平方比较以省去开方"""
+    vx = (np.asarray(lon2, dtype=np.float64) - lon1) * DEG2M_LON
+    vy = (np.asarray(lat2, dtype=np.float64) - lat1) * DEG2M
+    wx = (np.asarray(lon, dtype=np.float64) - lon1) * DEG2M_LON
+    wy = (np.asarray(lat, dtype=np.float64) - lat1) * DEG2M
+
+    seg_len2 = vx * vx + vy * vy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(seg_len2 > 0, (vx * wx + vy * wy) / seg_len2, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+
+    dx = wx - t * vx
+    dy = wy - t * vy
+    return dx * dx + dy * dy
+
+
+def to_route(route) -> Route:
+    """
+    将航路转换为Route数组结构，支持：含name/path的字典、航路点字典列表、
+    WAYPOINT_DTYPE 结构化数组，以及每行为 (经度, 纬度, 高度[, 时间]) 的二维数组
+    """
+    if isinstance(route, Route):
+        return route
+    if isinstance(route, np.ndarray) and route.dtype.names is not None:
+        lon, lat, h, t = (np.ascontiguousarray(route[key], dtype=np.float64) for key in ("lon", "lat", "h", "t"))
+        lat_r = np.radians(lat)
+        return Route(None, lat, lon, h, t, lat_r, np.radians(lon), np.cos(lat_r))
+    if isinstance(route, np.ndarray):
+        points = np.atleast_2d(np.asarray(route, dtype=np.float64))
+        lon, lat, h = (np.ascontiguousarray(points[:, k]) for k in range(3))
+        t = np.ascontiguousarray(points[:, 3]) if points.shape[1] > 3 else np.full(len(points), np.nan)
+        lat_r = np.radians(lat)
+        return Route(None, lat, lon, h, t, lat_r, np.radians(lon), np.cos(lat_r))
+    if isinstance(route, dict):
+        name, path = route.get("name"), route["path"]
+    else:
+        name, path = None, route
+
+    count = len(path)
+    lat = np.fromiter((p["latitude"] for p in path), dtype=np.float64, count=count)
+    lon = np.fromiter((p["longitude"] for p in path), dtype=np.float64, count=count)
+    # 高度、时间缺省时记为NaN，不参与后续比较
+    h = np.fromiter((p.get("height", np.nan) for p in path), dtype=np.float64, count=count)
+    t = np.fromiter((p.get("time", np.nan) for p in path), dtype=np.float64, count=count)
+
+    lat_r = np.radians(lat)
+    return Route(name, lat, lon, h, t, lat_r, np.radians(lon), np.cos(lat_r))
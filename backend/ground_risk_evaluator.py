@@ -1,7 +1,52 @@
 # ground_risk_evaluator.py
+import bisect
 import math
+import numpy as np
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
+# 撞击角度（假设失控后以45度角下降）的正切，以及风偏移占高度的比例
+IMPACT_ANGLE_TAN = math.tan(math.radians(45))
+WIND_DRIFT_FACTOR = 0.1
+
+# 风险等级划分：风险值小于第 i 个阈值（且不小于前一个）时为第 i 个等级
+RISK_LEVEL_THRESHOLDS = (0.1, 0.3, 0.6)
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+_RISK_LEVEL_ARRAY = np.array(RISK_LEVELS)
+
+# 人口密度分区（示例）：每个分区为 (最小经度, 最大经度, 最小纬度, 最大纬度, 人口密度（人/平方米）)，
+# 按顺序取第一个包含该点的分区，都不包含时为郊区密度；实际应用中应替换为GIS服务的数据
+POPULATION_REGIONS = (
+    (113.25, 113.35, 23.10, 23.15, 0.01),  # 广州市中心，相当于10000人/平方公里
+)
+DEFAULT_POPULATION_DENSITY = 0.001  # 郊区，相当于1000人/平方公里
+
+
+@lru_cache(maxsize=8192)
+def population_density_at(lon: float, lat: float, regions: Tuple = POPULATION_REGIONS) -> float:
+    """单点在分区表 regions 下的人口密度（人/平方米），重复查询的坐标直接命中缓存"""
+    for min_lon, max_lon, min_lat, max_lat, density in regions:
+        if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
+            return density
+    return DEFAULT_POPULATION_DENSITY
+
+
+def population_density_np(lons, lats, regions: Tuple = POPULATION_REGIONS) -> np.ndarray:
+    """向量化的人口密度查询：位置 × 分区 的包含关系一次算出，取分区表 regions 中第一个包含的分区"""
+    lons = np.asarray(lons, dtype=np.float64)[..., None]
+    lats = np.asarray(lats, dtype=np.float64)[..., None]
+    table = np.array(regions, dtype=np.float64).reshape(-1, 5)
+    inside = ((lons >= table[:, 0]) & (lons <= table[:, 1]) &
+              (lats >= table[:, 2]) & (lats <= table[:, 3]))
+    first = inside.argmax(axis=-1)
+    return np.where(inside.any(axis=-1), table[first, 4], DEFAULT_POPULATION_DENSITY)
+
+
+def risk_levels_np(risk_scores) -> np.ndarray:
+    """向量化的风险等级划分，返回等级名称数组"""
+    return _RISK_LEVEL_ARRAY[np.searchsorted(RISK_LEVEL_THRESHOLDS, risk_scores, side="right")]
+
+
 class GroundRiskEvaluator:
     """对地风险评估器"""
     
@@ -19,17 +64,52 @@ class GroundRiskEvaluator:
             "height": 1.7   # 米
         }
         
+        # 评估结果只取决于 (高度, 经度, 纬度, 无人机半径, 无人机重量, 人口分区表)，
+        # 按实例缓存重复出现的位置；参数都在缓存键中，修改 UAV_PARAMS 或分区表后不会命中旧结果。
+        # 缓存与实例同生命周期：它持有绑定方法，与实例构成循环引用，实例不再使用后由垃圾回收
+        # 连同缓存一起释放；每个实例最多保留65536条结果，长期持有的实例可调用 clear_cache 释放
+        self._evaluate_cached = lru_cache(maxsize=65536)(self._evaluate)
+    
+    def clear_cache(self):
+        """清空本实例的评估结果缓存"""
+        self._evaluate_cached.cache_clear()
+        
     def evaluate_ground_risk(self, position: Dict, uav_type: str = "medium") -> Dict:
         """评估对地风险"""
-        # 获取无人机参数
         uav = self.UAV_PARAMS.get(uav_type, self.UAV_PARAMS["medium"])
+        # 统一转为float作为缓存键，NumPy标量与0维数组同样可用
+        (impact_probability, impact_area, severity, total_risk, risk_level, population_density,
+         mitigation, recommendations) = self._evaluate_cached(
+            float(position['height']), float(position['longitude']), float(position['latitude']),
+            float(uav['radius']), float(uav['weight']), POPULATION_REGIONS
+        )
+        
+        return {
+            "impact_probability": impact_probability,
+            "impact_area_m2": impact_area,
+            "severity_score": severity,
+            "total_risk": total_risk,
+            "risk_level": risk_level,
+            "population_density": population_density,
+            "mitigation_factor": mitigation,
+            "mitigated_risk": total_risk * (1 - mitigation),
+            "recommendations": list(recommendations)
+        }
+    
+    def _evaluate(self, height: float, lon: float, lat: float,
+                  radius: float, weight: float, regions: Tuple) -> Tuple:
+        """对地风险评估的计算部分（纯函数，只依赖参数），返回各项指标组成的元组供缓存"""
+        position = {"longitude": lon, "latitude": lat, "height": height}
+        
+        # 参与计算的无人机参数
+        uav = {"radius": radius, "weight": weight}
         
         # 1. 计算撞击概率区域
         impact_area = self._calculate_impact_area(position['height'], uav)
         
         # 2. 获取人口密度
         population_density = self._get_population_density(
-            position['longitude'], position['latitude']
+            position['longitude'], position['latitude'], regions
         )
         
         # 3. 计算撞击概率
@@ -46,28 +126,54 @@ class GroundRiskEvaluator:
         # 6. 计算缓解措施效果
         mitigation = self._calculate_mitigation_effect(position)
         
+        return (impact_probability, impact_area, severity, total_risk,
+                self._get_risk_level(total_risk), population_density, mitigation,
+                tuple(self._get_risk_recommendations(total_risk, position)))
+    
+    def evaluate_ground_risk_batch(self, heights: np.ndarray, lons: np.ndarray, lats: np.ndarray,
+                                   uav_type: str = "medium") -> Dict[str, np.ndarray]:
+        """批量评估一组位置的对地风险，与 evaluate_ground_risk 的指标相同（不含建议），各项以数组返回"""
+        uav = self.UAV_PARAMS.get(uav_type, self.UAV_PARAMS["medium"])
+        heights = np.asarray(heights, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        
+        # 撞击影响区域
+        impact_radius = heights / IMPACT_ANGLE_TAN + heights * WIND_DRIFT_FACTOR + uav['radius']
+        impact_area = math.pi * impact_radius ** 2
+        
+        # 人口密度与撞击概率
+        population_density = population_density_np(lons, lats, POPULATION_REGIONS)
+        impact_probability = np.clip(impact_area * population_density * 0.1, 0.0, 1.0)
+        
+        # 伤害严重度（自由落体撞击动能归一化）
+        impact_velocity = np.sqrt(2 * 9.8 * heights)
+        kinetic_energy = 0.5 * uav['weight'] * impact_velocity ** 2
+        severity = np.clip(kinetic_energy / 10000, 0.0, 1.0)
+        
+        total_risk = impact_probability * severity
+        
+        # 缓解措施：降落伞（高度大于50米时有效）+ 地理围栏 + 实时监控，最大缓解80%
+        mitigation = np.clip(np.where(heights > 50, 0.3, 0.0) + 0.2 + 0.1, 0.0, 0.8)
+        
         return {
             "impact_probability": impact_probability,
             "impact_area_m2": impact_area,
             "severity_score": severity,
             "total_risk": total_risk,
-            "risk_level": self._get_risk_level(total_risk),
+            "risk_level": risk_levels_np(total_risk),
             "population_density": population_density,
             "mitigation_factor": mitigation,
-            "mitigated_risk": total_risk * (1 - mitigation),
-            "recommendations": self._get_risk_recommendations(total_risk, position)
+            "mitigated_risk": total_risk * (1 - mitigation)
         }
     
     def _calculate_impact_area(self, height: float, uav: Dict) -> float:
         """计算撞击影响区域（基于论文公式）"""
-        # 撞击角度（假设失控后的下降角）
-        impact_angle = math.radians(45)  # 45度角
-        
         # 水平偏移距离
-        horizontal_distance = height / math.tan(impact_angle)
+        horizontal_distance = height / IMPACT_ANGLE_TAN
         
         # 考虑风的影响（简化模型）
-        wind_drift = height * 0.1  # 假设10%的高度作为风偏移
+        wind_drift = height * WIND_DRIFT_FACTOR
         
         # 总影响半径
         impact_radius = horizontal_distance + wind_drift + uav['radius']
@@ -77,25 +183,10 @@ class GroundRiskEvaluator:
         
         return impact_area
     
-    def _get_population_density(self, lon: float, lat: float) -> float:
+    def _get_population_density(self, lon: float, lat: float, regions: Tuple) -> float:
         """获取人口密度（人/平方米）"""
-        # 实际应用中应该调用GIS服务获取真实数据
-        # 这里使用简化的区域判断
-        
-        # 广州市中心区域坐标范围（示例）
-        city_center = {
-            "min_lon": 113.25, "max_lon": 113.35,
-            "min_lat": 23.10, "max_lat": 23.15
-        }
-        
-        # 判断是否在市中心
-        if (city_center["min_lon"] <= lon <= city_center["max_lon"] and
-            city_center["min_lat"] <= lat <= city_center["max_lat"]):
-            # 市中心人口密度（人/平方米）
-            return 0.01  # 相当于10000人/平方公里
-        else:
-            # 郊区人口密度
-            return 0.001  # 相当于1000人/平方公里
+        # 实际应用中应该调用GIS服务获取真实数据，这里按分区表判断
+        return population_density_at(lon, lat, regions)
     
     def _calculate_impact_probability(self, impact_area: float, 
                                     population_density: float) -> float:
@@ -140,14 +231,7 @@ class GroundRiskEvaluator:
     
     def _get_risk_level(self, risk_score: float) -> str:
         """获取风险等级"""
-        if risk_score < 0.1:
-            return "LOW"
-        elif risk_score < 0.3:
-            return "MEDIUM"
-        elif risk_score < 0.6:
-            return "HIGH"
-        else:
-            return "CRITICAL"
+        return RISK_LEVELS[bisect.bisect_right(RISK_LEVEL_THRESHOLDS, risk_score)]
     
     def _get_risk_recommendations(self, risk_score: float, position: Dict) -> List[str]:
         """生成风险建议"""
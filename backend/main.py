@@ -1,14 +1,34 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from route_optimizer import RouteOptimizer
 from airspace_capacity import AirspaceCapacityAnalyzer
+from geo_utils import DEG2M, NUMBA_AVAILABLE, vector_math_info
+from noise_kernels import noise_at_point, grid_noise
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List
+import numpy as np
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
 import math
+import os
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时使用标准库json序列化
+    orjson = None
 
 
 
 
 app = FastAPI()
 
+# 随uvicorn的日志配置输出
+logger = logging.getLogger("uvicorn.error")
+
 origins = [
     "*",
 ]
@@ -96,54 +116,106 @@ FLIGHT_ROUTES = [ {
         ]
     }] 
 
-# 广州塔 113.32,23.11   广州天河体育中心  113.33,23.14
-# 噪声计算核心函数
-def calculateNoiseAtPoint(dronePosition, groundPoint):
-    # 计算水平距离（米）
-    R = 6371000  # 地球半径
-    φ1 = math.radians(dronePosition['latitude'])
-    φ2 = math.radians(groundPoint['latitude'])
-    Δφ = math.radians(groundPoint['latitude'] - dronePosition['latitude'])
-    Δλ = math.radians(groundPoint['longitude'] - dronePosition['longitude'])
-
-    a = math.sin(Δφ / 2) * math.sin(Δφ / 2) + math.cos(φ1) * math.cos(φ2) * math.sin(Δλ / 2) * math.sin(Δλ / 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    horizontalDistance = R * c
+# 噪声网格的计算精度：结果只用于热力图显示，单精度足够
+NOISE_DTYPE = np.float32
 
-    # 计算斜距
-    verticalDistance = dronePosition['height']
-    distance = math.sqrt(horizontalDistance * horizontalDistance + verticalDistance * verticalDistance)
+# 噪声网格的磁盘缓存目录；计算口径变化时递增版本号，使旧的缓存文件失效
+NOISE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+NOISE_CACHE_VERSION = 3
 
-    # 噪声衰减计算
-    referenceDistance = 1  # 1米参考距离
-    distanceAttenuation = 20 * math.log10(distance / referenceDistance)
+# 热力图数据在磁盘缓存中的数组形式：点坐标与热力值为结构化数组，其余为汇总值
+HEATMAP_POINT_DTYPE = np.dtype([('x', 'f8'), ('y', 'f8'), ('value', 'f4')])
+HEATMAP_SUMMARY_KEYS = ('minNoise', 'maxNoise', 'minLon', 'maxLon', 'minLat', 'maxLat')
 
-    # 大气衰减（简化模型）
-    atmosphericAttenuation = 0.005 * distance
+# 广州塔 113.32,23.11   广州天河体育中心  113.33,23.14
+# 噪声计算核心函数
+def calculateNoiseAtPoint(droneLat, droneLon, droneHeight, groundLat, groundLon):
+    # 位置参数直接传入编译内核，不经过字典查找
+    return noise_at_point(droneLat, droneLon, droneHeight, groundLat, groundLon)
+
+# 字典参数的兼容接口
+def calculateNoiseAtPosition(dronePosition, groundPoint):
+    return calculateNoiseAtPoint(
+        dronePosition['latitude'], dronePosition['longitude'], dronePosition['height'],
+        groundPoint['latitude'], groundPoint['longitude']
+    )
 
+# 计算一组无人机位置对整个地面网格的噪声衰减，网格由经度轴 lons 与纬度轴 lats 张成
+# 网格范围在城市尺度内，水平距离按等距圆柱投影近似，cosLat0 为网格中心纬度余弦
+# 返回 (最后一个位置的衰减, 最小衰减, 最大衰减)，每个数组形状为 (len(lons), len(lats))
+def calculateNoiseGrid(droneLons, droneLats, droneHeights, lons, lats, cosLat0, blockSize=2000000):
+    # 以网格原点为基准投影到平面坐标（米）：偏移量先按float64计算再转为NOISE_DTYPE，
+    # 避免经纬度直接乘以每度米数后的大数值在单精度下丢失精度
+    kx = DEG2M * cosLat0
+    lon0, lat0 = lons[0], lats[0]
+    groundX = ((lons - lon0) * kx).astype(NOISE_DTYPE)
+    groundY = ((lats - lat0) * DEG2M).astype(NOISE_DTYPE)
+    droneX = ((droneLons - lon0) * kx).astype(NOISE_DTYPE)
+    droneY = ((droneLats - lat0) * DEG2M).astype(NOISE_DTYPE)
+    droneHeights = droneHeights.astype(NOISE_DTYPE)
+
+    # 有numba时由并行编译内核逐点累计，不生成 (无人机位置 × 地面点) 的中间数组
+    if NUMBA_AVAILABLE:
+        return grid_noise(droneX, droneY, droneHeights, groundX, groundY)
+    return calculateNoiseGridNumPy(droneX, droneY, droneHeights, groundX, groundY, blockSize)
+
+# calculateNoiseGrid 的NumPy实现（未安装numba时使用）
+def calculateNoiseGridNumPy(droneX, droneY, droneHeights, groundX, groundY, blockSize):
+    gridShape = (len(groundX), len(groundY))
+    # 经纬度轴广播成网格
+    groundX = groundX[:, None]
+    groundY = groundY[None, :]
     # 地面效应（低空飞行时增强）
-    if dronePosition['height'] < 100:
-        groundEffect = 3 * (1 - dronePosition['height'] / 100)
-    else:
-        groundEffect = 0
-
-    return max(distanceAttenuation + atmosphericAttenuation - groundEffect, 0)
+    groundEffects = np.where(droneHeights < 100, 3 * (1 - droneHeights / 100), 0.0)
+
+    minAttenuation = np.full(gridShape, np.inf, dtype=NOISE_DTYPE)
+    maxAttenuation = np.full(gridShape, -np.inf, dtype=NOISE_DTYPE)
+    attenuation = None
+
+    # 按块广播 (无人机位置 × 地面点)，限制中间数组的内存占用；
+    # 各块复用同一组缓冲区，逐项原地计算，避免每个算式生成新的临时数组
+    step = max(1, min(blockSize // max(gridShape[0] * gridShape[1], 1), len(droneX)))
+    distanceBuffer = np.empty((step,) + gridShape, dtype=NOISE_DTYPE)
+    attenuationBuffer = np.empty_like(distanceBuffer)
+    expand = (slice(None), None, None)
+    for start in range(0, len(droneX), step):
+        block = slice(start, start + step)
+        dx = groundX - droneX[block][expand]
+        dy = groundY - droneY[block][expand]
+        verticalDistance = droneHeights[block][expand]
+        distance = np.add(dx * dx, dy * dy, out=distanceBuffer[:len(verticalDistance)])
+        distance += verticalDistance * verticalDistance
+        np.sqrt(distance, out=distance)
+
+        # 距离衰减 + 大气衰减 - 地面效应，且不小于0
+        attenuation = np.log10(distance, out=attenuationBuffer[:len(verticalDistance)])
+        attenuation *= 20
+        distance *= 0.005
+        attenuation += distance
+        attenuation -= groundEffects[block][expand]
+        np.maximum(attenuation, 0, out=attenuation)
+
+        np.minimum(minAttenuation, attenuation.min(axis=0), out=minAttenuation)
+        np.maximum(maxAttenuation, attenuation.max(axis=0), out=maxAttenuation)
+
+    lastAttenuation = attenuation[-1].copy() if attenuation is not None else np.zeros(gridShape, dtype=NOISE_DTYPE)
+    return lastAttenuation, minAttenuation, maxAttenuation
 
 # 生成网格化噪声数据（符合当前项目的GeoJSON格式）
 def generateNoiseGeoJSON(route, gridSize = 50):
     features = []
 
-    # 确定路线的边界
-    minLon = float('inf')
-    maxLon = float('-inf')
-    minLat = float('inf')
-    maxLat = float('-inf')
+    # 航路点坐标一次性取出为数组
+    pathLons, pathLats, pathHeights = (
+        np.array([point[key] for point in route['path']], dtype=np.float64)
+        for key in ('longitude', 'latitude', 'height')
+    )
 
-    for point in route['path']:
-        minLon = min(minLon, point['longitude'])
-        maxLon = max(maxLon, point['longitude'])
-        minLat = min(minLat, point['latitude'])
-        maxLat = max(maxLat, point['latitude'])
+    # 确定路线的边界
+    minLon = float(pathLons.min())
+    maxLon = float(pathLons.max())
+    minLat = float(pathLats.min())
+    maxLat = float(pathLats.max())
 
     # 扩展边界以覆盖噪声影响范围
     buffer = 0.005  # 约500米
@@ -157,31 +229,33 @@ def generateNoiseGeoJSON(route, gridSize = 50):
     latStep = gridSize / 111000  # 纬度步长
 
 
-    for lon in frange(minLon, maxLon + lonStep, lonStep):
-        for lat in frange(minLat, maxLat + latStep, latStep):
-            maxNoise = float(route['base_noise'])
-            minNoise = float(route['base_noise'])
-            noise = float(route['base_noise'])
+    lons = np.arange(minLon, maxLon + lonStep, lonStep)
+    lats = np.arange(minLat, maxLat + latStep, latStep)
 
-            # 计算整条飞行路线对该点的最大噪声影响
-            for index in range(len(route['path']) - 1):
-                point = route['path'][index]
-                nextPoint = route['path'][index + 1]
-                steps = 10  # 插值步数
-
-                for i in range(steps + 1):
-                    t = i / steps
-                    interpolatedPos = {
-                        'longitude': point['longitude'] + t * (nextPoint['longitude'] - point['longitude']),
-                        'latitude': point['latitude'] + t * (nextPoint['latitude'] - point['latitude']),
-                        'height': point['height'] + t * (nextPoint['height'] - point['height'])
-                    }
-
-                    attenuation = calculateNoiseAtPoint(interpolatedPos, {'longitude': lon, 'latitude': lat})
-                    noise = route['base_noise'] - attenuation
-                    maxNoise = max(maxNoise, noise)
-                    minNoise = min(minNoise, noise)
+    # 每个航段按 t = 0, 0.1, ..., 1 插值出无人机位置
+    steps = 10  # 插值步数
+    t = np.arange(steps + 1) / steps
+    droneLons, droneLats, droneHeights = (
+        (values[:-1, None] + t * (values[1:] - values[:-1])[:, None]).reshape(-1)
+        for values in (pathLons, pathLats, pathHeights)
+    )
 
+    # 计算整条飞行路线对每个网格点的噪声影响
+    baseNoise = float(route['base_noise'])
+    lastAttenuation, minAttenuation, maxAttenuation = calculateNoiseGrid(
+        droneLons, droneLats, droneHeights, lons, lats,
+        math.cos(math.radians((minLat + maxLat) / 2))
+    )
+    noise = baseNoise - lastAttenuation
+    maxNoise = np.maximum(baseNoise - minAttenuation, baseNoise)
+    minNoise = np.minimum(baseNoise - maxAttenuation, baseNoise)
+
+    # 按 (经度, 纬度) 网格行优先输出要素，坐标直接取自两个坐标轴，不生成网格化的坐标数组
+    latList = lats.tolist()
+    for lon, noiseRow, maxNoiseRow, minNoiseRow in zip(
+            lons.tolist(), noise.tolist(), maxNoise.tolist(), minNoise.tolist()):
+        for lat, pointNoise, pointMaxNoise, pointMinNoise in zip(
+                latList, noiseRow, maxNoiseRow, minNoiseRow):
             features.append({
                 'type': 'Feature',
                 'geometry': {
@@ -189,46 +263,33 @@ def generateNoiseGeoJSON(route, gridSize = 50):
                     'coordinates': [lon, lat]
                 },
                 'properties': {
-                    'noise': noise,
-                    'maxNoise': maxNoise,
-                    'minNoise': minNoise,
-                    'minLon': minLon,
-                    'maxLon': maxLon,
-                    'minLat': minLat,
-                    'maxLat': maxLat,
-                    'routeName': route['name']
+                    'noise': pointNoise,
+                    'maxNoise': pointMaxNoise,
+                    'minNoise': pointMinNoise
                 }
             })
 
+    # 网格边界与线路名称对所有要素相同，只在集合层级保存一份
     return {
         'type': 'FeatureCollection',
+        'properties': {
+            'bounds': [minLon, minLat, maxLon, maxLat],
+            'routeName': route['name']
+        },
         'features': features
     }
 
-# 辅助函数，用于生成浮点数范围
-def frange(start, stop, step):
-    while start <= stop:
-        yield start
-        start += step
-
 # 为Map.vue组件生成适配的噪声数据
-def generateNoiseDataForHeatmap(route):
-    noiseData = generateNoiseGeoJSON(route, 50)
+def generateNoiseDataForHeatmap(route, gridSize = 50):
+    noiseData = generateNoiseGeoJSON(route, gridSize)
     points = []
     minNoise = 0
     maxNoise = 0
-    minLon = None
-    maxLon = None
-    minLat = None
-    maxLat = None
+    minLon, minLat, maxLon, maxLat = noiseData['properties']['bounds']
 
     for feature in noiseData['features']:
         minNoise = feature['properties']['minNoise']
         maxNoise = feature['properties']['maxNoise']
-        minLon = feature['properties']['minLon']
-        maxLon = feature['properties']['maxLon']
-        minLat = feature['properties']['minLat']
-        maxLat = feature['properties']['maxLat']
         points.append({
             'x': feature['geometry']['coordinates'][0],
             'y': feature['geometry']['coordinates'][1],
@@ -245,11 +306,105 @@ def generateNoiseDataForHeatmap(route):
         'maxLat': maxLat
     }
 
+# 线路内容的哈希，线路修改后缓存文件自动失效
+def routeHash(route):
+    return hashlib.md5(json.dumps(route, sort_keys=True).encode()).hexdigest()
+
+# 热力图数据与磁盘缓存数组之间的转换（汇总值为None时以NaN保存）
+def heatmapToArrays(noiseData):
+    points = np.array([(point['x'], point['y'], point['value']) for point in noiseData['points']],
+                      dtype=HEATMAP_POINT_DTYPE)
+    summary = np.array([np.nan if noiseData[key] is None else noiseData[key]
+                        for key in HEATMAP_SUMMARY_KEYS], dtype=np.float64)
+    return points, summary
+
+def heatmapFromArrays(points, summary):
+    noiseData = {
+        'points': [{'x': x, 'y': y, 'value': value}
+                   for x, y, value in zip(points['x'].tolist(), points['y'].tolist(),
+                                          points['value'].tolist())]
+    }
+    for key, value in zip(HEATMAP_SUMMARY_KEYS, summary.tolist()):
+        noiseData[key] = None if math.isnan(value) else value
+    return noiseData
+
+# 按 (线路序号, 网格大小) 缓存热力图数据：内存中LRU缓存，磁盘上保存为压缩的npz
+@lru_cache(maxsize=32)
+def _noise_cached(index: int, grid: int):
+    route = FLIGHT_ROUTES[index]
+    cachePath = os.path.join(NOISE_CACHE_DIR, f'noise_v{NOISE_CACHE_VERSION}_{index}_{grid}_{routeHash(route)}.npz')
+    if os.path.exists(cachePath):
+        with np.load(cachePath) as cached:
+            return heatmapFromArrays(cached['points'], cached['summary'])
+
+    points, summary = heatmapToArrays(generateNoiseDataForHeatmap(route, grid))
+    os.makedirs(NOISE_CACHE_DIR, exist_ok=True)
+    # 先写临时文件再替换，避免其他进程读到写了一半的缓存
+    tmpPath = f'{cachePath}.{os.getpid()}.tmp'
+    with open(tmpPath, 'wb') as f:
+        np.savez_compressed(f, points=points, summary=summary)
+    os.replace(tmpPath, cachePath)
+    return heatmapFromArrays(points, summary)
+
+# 客户端是否接受gzip编码：按 Accept-Encoding 中各编码的q值判断，q=0 表示明确拒绝，
+# 未列出gzip时看通配符 *
+def acceptsGzip(acceptEncoding):
+    qualities = {}
+    for item in acceptEncoding.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        coding = coding.lower()
+        if coding:
+            qualities['gzip' if coding == 'x-gzip' else coding] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+# 序列化后的热力图响应体：(JSON字节串, gzip压缩后的字节串)
+@lru_cache(maxsize=32)
+def _noise_payload(index: int, grid: int):
+    noiseData = _noise_cached(index, grid)
+    body = orjson.dumps(noiseData) if orjson is not None else json.dumps(noiseData).encode()
+    return body, gzip.compress(body)
+
+# 启动时预先计算并序列化好的各线路热力图响应体
+PRECOMPUTED_NOISE = {}
+
+@app.on_event("startup")
+async def _report_vector_math():
+    # 噪声内核的速度取决于安装环境：numba是否可用、能否使用SVML、NumPy链接的BLAS
+    info = vector_math_info()
+    logger.info("numba: %s, SVML: %s, NumPy BLAS: %s", info['numba'], info['svml'], info['blas'])
+
+@app.on_event("startup")
+async def _precompute():
+    # 各线路的网格互不相关，用多进程并行计算和序列化（命中磁盘缓存时直接读取）
+    loop = asyncio.get_running_loop()
+    workers = min(len(FLIGHT_ROUTES), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, _noise_payload, index, 50)
+            for index in range(len(FLIGHT_ROUTES))
+        ))
+    PRECOMPUTED_NOISE.update(enumerate(results))
+
 @app.get("/noise")
-def get_data(index: int = None):
-    if index is not None and 0 <= index < len(FLIGHT_ROUTES):
-        return generateNoiseDataForHeatmap(FLIGHT_ROUTES[index])
-    return generateNoiseDataForHeatmap(FLIGHT_ROUTES[0])
+def get_data(request: Request, index: int = None):
+    if index is None or not 0 <= index < len(FLIGHT_ROUTES):
+        index = 0
+    payload = PRECOMPUTED_NOISE.get(index)
+    body, compressed = payload if payload is not None else _noise_payload(index, 50)
+
+    # 客户端支持gzip时直接返回预先压缩的响应体
+    if acceptsGzip(request.headers.get('accept-encoding', '')):
+        return Response(content=compressed, media_type='application/json',
+                        headers={'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'})
+    return Response(content=body, media_type='application/json')
 
 @app.get("/data")
 def get_data():
@@ -260,6 +415,13 @@ def get_data():
 route_optimizer = RouteOptimizer()
 capacity_analyzer = AirspaceCapacityAnalyzer()
 
+# 空域分析用的进程池：各航路的计算互不相关，分散到多个CPU核心，不阻塞事件循环
+analysis_executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+
+@app.on_event("shutdown")
+def _shutdown_executor():
+    analysis_executor.shutdown(cancel_futures=True)
+
 @app.get("/optimize_route")
 def optimize_route(
     start_lon: float, start_lat: float,
@@ -292,25 +454,30 @@ def optimize_route(
     }
 
 @app.get("/airspace_analysis")
-def analyze_airspace():
+async def analyze_airspace():
     """分析当前空域状况"""
+    loop = asyncio.get_running_loop()
     
     # 分析所有航路的冲突概率
     all_routes = [route["path"] for route in FLIGHT_ROUTES]
-    
-    conflict_probability = capacity_analyzer.analyze_conflict_probability(
+    conflict_task = loop.run_in_executor(
+        analysis_executor,
+        capacity_analyzer.analyze_conflict_probability,
         all_routes,
-        traffic_density=5  # 假设每平方公里5架无人机
+        5  # 假设每平方公里5架无人机
     )
     
-    # 计算每条航路的容量
-    route_capacities = []
-    for route in FLIGHT_ROUTES:
-        capacity = capacity_analyzer.calculate_route_capacity(route["path"])
-        route_capacities.append({
-            "name": route["name"],
-            "capacity": capacity
-        })
+    # 计算每条航路的容量，与冲突分析一起在进程池中并行执行
+    capacity_tasks = [
+        loop.run_in_executor(analysis_executor, capacity_analyzer.calculate_route_capacity, route["path"])
+        for route in FLIGHT_ROUTES
+    ]
+    conflict_probability, *capacities = await asyncio.gather(conflict_task, *capacity_tasks)
+    
+    route_capacities = [
+        {"name": route["name"], "capacity": capacity}
+        for route, capacity in zip(FLIGHT_ROUTES, capacities)
+    ]
     
     return {
         "conflict_probability": conflict_probability,
@@ -333,4 +500,5 @@ def generate_recommendations(conflict_prob: float) -> List[str]:
 
 if __name__ == '__main__':
     import uvicorn
-    uvicorn.run("main:app", host="127.0.0.1", port=8080,  reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="127.0.0.1", port=8080,  reload=True,
+                reload_excludes=["**/.ipynb_checkpoints/*"])
\ No newline at end of file
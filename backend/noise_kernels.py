@@ -0,0 +1,89 @@
+# noise_kernels.py
+"""
+噪声计算的JIT编译内核
+
+安装了numba时编译为本地代码并对地面网格并行计算，否则为等价的纯Python实现。
+"""
+
+import math
+import numpy as np
+
+from geo_utils import haversine_rad_m, njit, prange
+
+
+@njit(cache=True, fastmath=True)
+def ground_effect(drone_h):
+    """地面效应修正量（dB），低空飞行时增强"""
+    if drone_h < 100:
+        return 3 * (1 - drone_h / 100)
+    return 0.0
+
+
+@njit(cache=True, fastmath=True)
+def attenuation_at_distance(distance, drone_h):
+    """给定斜距（米）和无人机高度计算噪声衰减（dB）"""
+    # 距离衰减（1米参考距离）+ 大气衰减（简化模型）- 地面效应
+    attenuation = 20 * math.log10(distance) + 0.005 * distance - ground_effect(drone_h)
+    return max(attenuation, 0.0)
+
+
+@njit(cache=True, fastmath=True)
+def noise_at_point(drone_lat, drone_lon, drone_h, g_lat, g_lon):
+    """无人机在某地面点产生的噪声衰减（dB），水平距离按Haversine计算"""
+    drone_phi = math.radians(drone_lat)
+    g_phi = math.radians(g_lat)
+    return noise_at_point_rad(drone_phi, math.radians(drone_lon), math.cos(drone_phi), drone_h,
+                              g_phi, math.radians(g_lon), math.cos(g_phi))
+
+
+@njit(cache=True, fastmath=True)
+def noise_at_point_rad(drone_phi, drone_lam, cos_drone_phi, drone_h, g_phi, g_lam, cos_g_phi):
+    """同 noise_at_point，经纬度为调用方预先换算的弧度及纬度余弦，供循环外统一换算后复用"""
+    horizontal = haversine_rad_m(drone_phi, drone_lam, cos_drone_phi, g_phi, g_lam, cos_g_phi)
+    distance = math.sqrt(horizontal * horizontal + drone_h * drone_h)
+    return attenuation_at_distance(distance, drone_h)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def grid_noise(drone_x, drone_y, drone_heights, ground_x, ground_y):
+    """
+    一组无人机位置对 ground_x × ground_y 网格的噪声衰减，按x方向逐行并行计算
+    坐标为同一原点下的平面坐标（米），结果数组与输入坐标同精度；每个地面点在循环内
+    累计最小/最大衰减，不生成 (无人机位置 × 地面点) 的中间数组，
+    返回 (最后一个位置的衰减, 最小衰减, 最大衰减)
+    """
+    n_x = ground_x.shape[0]
+    n_y = ground_y.shape[0]
+    n_drone = drone_x.shape[0]
+    last = np.zeros((n_x, n_y), dtype=ground_x.dtype)
+    lowest = np.empty((n_x, n_y), dtype=ground_x.dtype)
+    highest = np.empty((n_x, n_y), dtype=ground_x.dtype)
+
+    # 只与无人机位置有关的量在网格循环外算好：高度平方与地面效应
+    drone_h2 = np.empty(n_drone, dtype=ground_x.dtype)
+    drone_effect = np.empty(n_drone, dtype=ground_x.dtype)
+    for d in range(n_drone):
+        drone_h2[d] = drone_heights[d] * drone_heights[d]
+        drone_effect[d] = ground_effect(drone_heights[d])
+
+    for gi in prange(n_x):
+        gx = ground_x[gi]
+        for gj in range(n_y):
+            gy = ground_y[gj]
+            low = np.inf
+            high = -np.inf
+            attenuation = 0.0
+            for d in range(n_drone):
+                dx = gx - drone_x[d]
+                dy = gy - drone_y[d]
+                distance = math.sqrt(dx * dx + dy * dy + drone_h2[d])
+                attenuation = max(20 * math.log10(distance) + 0.005 * distance - drone_effect[d], 0.0)
+                if attenuation < low:
+                    low = attenuation
+                if attenuation > high:
+                    high = attenuation
+            last[gi, gj] = attenuation
+            lowest[gi, gj] = low
+            highest[gi, gj] = high
+
+    return last, lowest, highest
@@ -1,7 +1,14 @@
 # ntsc_calculator.py
 import math
+import numpy as np
 from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from geo_utils import DEG2M, planar_distance_np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # 未安装scipy时退化为枚举全部飞行段对
+    cKDTree = None
 
 @dataclass
 class FlightSegment:
@@ -11,6 +18,16 @@ class FlightSegment:
     start_pos: Dict[str, float]
     end_pos: Dict[str, float]
     aircraft_id: str
+    # 插值用的端点数组 (经度, 纬度, 高度)、位移与时长，创建时算好一次
+    start_arr: np.ndarray = field(init=False, repr=False, compare=False)
+    delta_arr: np.ndarray = field(init=False, repr=False, compare=False)
+    duration: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        keys = ("longitude", "latitude", "height")
+        self.start_arr = np.array([self.start_pos[key] for key in keys], dtype=np.float64)
+        self.delta_arr = np.array([self.end_pos[key] for key in keys], dtype=np.float64) - self.start_arr
+        self.duration = self.end_time - self.start_time
 
 class NTSCCalculator:
     """NTSC (Near-Term Separation Capability) 计算器"""
@@ -21,39 +38,44 @@ class NTSCCalculator:
         
     def calculate_ntsc(self, flight_segments: List[FlightSegment]) -> Dict:
         """计算NTSC指标"""
-        total_flight_time = 0
         conflict_time = 0
         conflict_details = []
+        segments = self._to_soa(flight_segments)
         
         # 计算总飞行时间
-        for segment in flight_segments:
-            total_flight_time += segment.end_time - segment.start_time
-        
-        # 检查每对飞行段之间的冲突
-        for i in range(len(flight_segments)):
-            for j in range(i + 1, len(flight_segments)):
-                seg1 = flight_segments[i]
-                seg2 = flight_segments[j]
-                
-                if seg1.aircraft_id == seg2.aircraft_id:
-                    continue
-                    
-                # 计算时间重叠
-                overlap_start = max(seg1.start_time, seg2.start_time)
-                overlap_end = min(seg1.end_time, seg2.end_time)
-                
-                if overlap_start < overlap_end:
-                    conflict_duration, min_distance = self._calculate_conflict_duration(
-                        seg1, seg2, overlap_start, overlap_end
-                    )
-                    if conflict_duration > 0:
-                        conflict_time += conflict_duration
-                        conflict_details.append({
-                            "aircraft_pair": (seg1.aircraft_id, seg2.aircraft_id),
-                            "duration": conflict_duration,
-                            "min_distance": min_distance,
-                            "time_range": (overlap_start, overlap_end)
-                        })
+        total_flight_time = float((segments["end_time"] - segments["start_time"]).sum())
+        
+        # 飞行段对 (i < j) 由KD树近邻查询给出（无scipy时枚举全部），
+        # 再一次性筛选：不同航空器、时间有重叠且包围盒在安全间隔内相交
+        if cKDTree is not None:
+            pair_i, pair_j = self._kdtree_pairs(segments)
+        else:
+            pair_i, pair_j = np.triu_indices(len(flight_segments), k=1)
+        overlap_start = np.maximum(segments["start_time"][pair_i], segments["start_time"][pair_j])
+        overlap_end = np.minimum(segments["end_time"][pair_i], segments["end_time"][pair_j])
+        candidates = np.nonzero(
+            (segments["aircraft"][pair_i] != segments["aircraft"][pair_j]) &
+            (overlap_start < overlap_end) &
+            self._bbox_overlap(segments, pair_i, pair_j)
+        )[0]
+        
+        # 检查每对候选飞行段之间的冲突
+        for k in candidates.tolist():
+            seg1 = flight_segments[pair_i[k]]
+            seg2 = flight_segments[pair_j[k]]
+            start, end = float(overlap_start[k]), float(overlap_end[k])
+            
+            conflict_duration, min_distance = self._calculate_conflict_duration(
+                seg1, seg2, start, end
+            )
+            if conflict_duration > 0:
+                conflict_time += conflict_duration
+                conflict_details.append({
+                    "aircraft_pair": (seg1.aircraft_id, seg2.aircraft_id),
+                    "duration": conflict_duration,
+                    "min_distance": min_distance,
+                    "time_range": (start, end)
+                })
         
         ntsc = conflict_time / total_flight_time if total_flight_time > 0 else 0
         
@@ -66,63 +88,131 @@ class NTSCCalculator:
             "safety_level": self._get_safety_level(ntsc)
         }
     
+    def _to_soa(self, flight_segments: List[FlightSegment]) -> Dict[str, np.ndarray]:
+        """将飞行段列表转换为按字段存放的数组（SoA）"""
+        count = len(flight_segments)
+        soa = {
+            "start_time": np.fromiter((s.start_time for s in flight_segments), dtype=np.float64, count=count),
+            "end_time": np.fromiter((s.end_time for s in flight_segments), dtype=np.float64, count=count),
+        }
+        for prefix, attr in (("start", "start_pos"), ("end", "end_pos")):
+            for key, name in (("lon", "longitude"), ("lat", "latitude"), ("h", "height")):
+                soa[f"{prefix}_{key}"] = np.fromiter(
+                    (getattr(s, attr)[name] for s in flight_segments), dtype=np.float64, count=count
+                )
+        # 航空器编号映射为整数，便于数组比较
+        aircraft_codes = {}
+        soa["aircraft"] = np.fromiter(
+            (aircraft_codes.setdefault(s.aircraft_id, len(aircraft_codes)) for s in flight_segments),
+            dtype=np.int64, count=count
+        )
+        return soa
+    
+    def _kdtree_pairs(self, segments: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        基于cKDTree固定半径查询的候选飞行段对（i < j，按 i、j 升序）
+        每个飞行段按1秒间隔采样，点坐标为局部平面 (x, y) 加上缩放后的时间与高度；
+        冲突时刻两段各有一个采样点与之相差不超过半个间隔，按最大速度放宽间隔后，
+        冲突飞行段对的这两个采样点在缩放空间中的距离必小于查询半径
+        """
+        time_step = 1.0
+        duration = segments["end_time"] - segments["start_time"]
+        valid = np.nonzero(duration > 0)[0]
+        if len(valid) < 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        # 以所有端点的中心为原点投影到局部平面（米）
+        lat0 = float(np.concatenate((segments["start_lat"][valid], segments["end_lat"][valid])).mean())
+        lon0 = float(np.concatenate((segments["start_lon"][valid], segments["end_lon"][valid])).mean())
+        kx = DEG2M * math.cos(math.radians(lat0))
+        start_x = (segments["start_lon"] - lon0) * kx
+        start_y = (segments["start_lat"] - lat0) * DEG2M
+        delta_x = (segments["end_lon"] - segments["start_lon"]) * kx
+        delta_y = (segments["end_lat"] - segments["start_lat"]) * DEG2M
+        delta_h = segments["end_h"] - segments["start_h"]
+        
+        # 采样点之间的位移不超过 最大速度 × 半个间隔，两段合计按一个间隔放宽
+        reach_h = self.HORIZONTAL_SEPARATION + \
+            float((np.hypot(delta_x, delta_y)[valid] / duration[valid]).max()) * time_step
+        reach_v = self.VERTICAL_SEPARATION + \
+            float((np.abs(delta_h)[valid] / duration[valid]).max()) * time_step
+        
+        # 每段的采样时刻：起点起每隔 time_step 一个，最后一个落在终点
+        counts = np.ceil(duration[valid] / time_step).astype(np.int64) + 1
+        owner = np.repeat(valid, counts)
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        times = np.minimum(segments["start_time"][owner] + k * time_step, segments["end_time"][owner])
+        ratio = (times - segments["start_time"][owner]) / duration[owner]
+        
+        # 时间差一个间隔、水平与垂直各差放宽后的间隔时，缩放空间中的距离为 √3·reach_h
+        points = np.column_stack((
+            times * (reach_h / time_step),
+            start_x[owner] + ratio * delta_x[owner],
+            start_y[owner] + ratio * delta_y[owner],
+            (segments["start_h"][owner] + ratio * delta_h[owner]) * (reach_h / reach_v)
+        ))
+        # 半径留5%余量，覆盖局部投影与冲突判定所用投影之间的误差
+        pairs = cKDTree(points).query_pairs(reach_h * math.sqrt(3) * 1.05, output_type='ndarray')
+        
+        a, b = owner[pairs[:, 0]], owner[pairs[:, 1]]
+        different = a != b
+        codes = np.unique(np.minimum(a, b)[different] * len(duration) + np.maximum(a, b)[different])
+        return codes // len(duration), codes % len(duration)
+    
+    def _bbox_overlap(self, segments: Dict[str, np.ndarray],
+                      pair_i: np.ndarray, pair_j: np.ndarray) -> np.ndarray:
+        """
+        飞行段对的包围盒预筛：水平方向按安全间隔扩展后相交，且高度范围相距小于垂直间隔
+        插值位置始终在飞行段端点的包围盒内，被排除的飞行段对不可能产生冲突
+        """
+        def bounds(key):
+            low = np.minimum(segments[f"start_{key}"], segments[f"end_{key}"])
+            high = np.maximum(segments[f"start_{key}"], segments[f"end_{key}"])
+            return low, high
+        
+        def gap(low, high):
+            # 两个区间之间的间距，区间相交时为0
+            return np.maximum(np.maximum(low[pair_i] - high[pair_j], low[pair_j] - high[pair_i]), 0)
+        
+        lon_low, lon_high = bounds("lon")
+        lat_low, lat_high = bounds("lat")
+        h_low, h_high = bounds("h")
+        
+        # 与冲突判定一致，经度方向按第一个飞行段起点纬度换算为米
+        buf_lat = self.HORIZONTAL_SEPARATION / DEG2M
+        buf_lon = buf_lat / np.cos(np.radians(segments["start_lat"][pair_i]))
+        
+        return ((gap(lon_low, lon_high) <= buf_lon) &
+                (gap(lat_low, lat_high) <= buf_lat) &
+                (gap(h_low, h_high) < self.VERTICAL_SEPARATION))
+    
     def _calculate_conflict_duration(self, seg1: FlightSegment, seg2: FlightSegment,
                                    overlap_start: float, overlap_end: float) -> Tuple[float, float]:
         """计算冲突持续时间和最小距离"""
-        conflict_duration = 0
-        min_distance = float('inf')
         time_step = 1.0  # 1秒的时间步长
         
-        t = overlap_start
-        while t <= overlap_end:
-            pos1 = self._interpolate_position(seg1, t)
-            pos2 = self._interpolate_position(seg2, t)
-            
-            horizontal_dist = self._haversine_distance(
-                pos1['latitude'], pos1['longitude'],
-                pos2['latitude'], pos2['longitude']
-            )
-            vertical_dist = abs(pos1['height'] - pos2['height'])
-            
-            total_distance = math.sqrt(horizontal_dist**2 + vertical_dist**2)
-            min_distance = min(min_distance, total_distance)
-            
-            if (horizontal_dist < self.HORIZONTAL_SEPARATION and 
-                vertical_dist < self.VERTICAL_SEPARATION):
-                conflict_duration += time_step
-                
-            t += time_step
+        # 重叠时段内所有采样时刻一次性插值（与逐秒步进的采样点相同）
+        steps = int(math.floor((overlap_end - overlap_start) / time_step)) + 1
+        times = overlap_start + np.arange(steps) * time_step
+        pos1 = self._interpolate_position(seg1, times)
+        pos2 = self._interpolate_position(seg2, times)
+        
+        # 冲突判定只关心50米量级的间隔，用等距圆柱投影近似即可，参考纬度余弦只算一次
+        cos_lat0 = math.cos(math.radians(seg1.start_pos['latitude']))
+        horizontal_dist = planar_distance_np(pos1[:, 1], pos1[:, 0], pos2[:, 1], pos2[:, 0], cos_lat0)
+        vertical_dist = np.abs(pos1[:, 2] - pos2[:, 2])
+        
+        in_conflict = ((horizontal_dist < self.HORIZONTAL_SEPARATION) &
+                       (vertical_dist < self.VERTICAL_SEPARATION))
+        conflict_duration = float(in_conflict.sum()) * time_step
+        min_distance = float(np.sqrt(horizontal_dist**2 + vertical_dist**2).min())
             
         return conflict_duration, min_distance
     
-    def _interpolate_position(self, segment: FlightSegment, time: float) -> Dict[str, float]:
-        """线性插值计算位置"""
-        t_ratio = (time - segment.start_time) / (segment.end_time - segment.start_time)
-        t_ratio = max(0, min(1, t_ratio))
-        
-        return {
-            'longitude': segment.start_pos['longitude'] + 
-                        t_ratio * (segment.end_pos['longitude'] - segment.start_pos['longitude']),
-            'latitude': segment.start_pos['latitude'] + 
-                       t_ratio * (segment.end_pos['latitude'] - segment.start_pos['latitude']),
-            'height': segment.start_pos['height'] + 
-                     t_ratio * (segment.end_pos['height'] - segment.start_pos['height'])
-        }
-    
-    def _haversine_distance(self, lat1: float, lon1: float, 
-                           lat2: float, lon2: float) -> float:
-        """计算两点间距离（米）"""
-        R = 6371000
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        delta_phi = math.radians(lat2 - lat1)
-        delta_lambda = math.radians(lon2 - lon1)
-        
-        a = math.sin(delta_phi/2)**2 + \
-            math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
+    def _interpolate_position(self, segment: FlightSegment, time) -> np.ndarray:
+        """线性插值计算位置 [经度, 纬度, 高度]；time 为时刻数组时返回形状为 (T, 3) 的坐标数组"""
+        t_ratio = np.clip((time - segment.start_time) / segment.duration, 0, 1)
+        return segment.start_arr + np.multiply.outer(t_ratio, segment.delta_arr)
     
     def _get_safety_level(self, ntsc: float) -> str:
         """根据NTSC值判断安全等级"""
@@ -1,6 +1,70 @@
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
 import math
+from geo_utils import (DEG2M, DEG2M_LON, NUMBA_AVAILABLE, WAYPOINT_DTYPE, njit,
+                       point_to_segment_distance_m, point_to_segment_distance_np, to_route)
+
+
+# 简化的人口密度估算（实际应用中应使用真实数据）：广州市中心区域
+# (最小经度, 最大经度, 最小纬度, 最大纬度) 内人口密度较高，其他区域较低
+DOWNTOWN_BOUNDS = (113.32, 113.33, 23.11, 23.14)
+DOWNTOWN_DENSITY = 0.8
+SUBURB_DENSITY = 0.4
+
+# 对地风险按 exp(-h/100) 衰减，航路最低点高于该高度（米）时各点风险不足0.01，
+# 对地风险直接记为0，不再逐点计算
+NEGLIGIBLE_GROUND_RISK_HEIGHT = 500
+
+# 不超过该点数的航路点字典列表走标量计算路径
+SMALL_ROUTE_POINTS = 4
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _segment_risk(lat, lon, h, i, obstacle_lat, obstacle_lon):
+    """第 i 个航段的碰撞风险：高度基础风险 + 50米安全距离内的障碍物风险，上限为1"""
+    avg_height = (h[i] + h[i + 1]) / 2
+    risk = 0.0
+    if avg_height < 50:
+        risk = 0.2
+    elif avg_height < 100:
+        risk = 0.1
+    for k in range(obstacle_lat.shape[0]):
+        distance = point_to_segment_distance_m(obstacle_lat[k], obstacle_lon[k],
+                                               lat[i], lon[i], lat[i + 1], lon[i + 1])
+        if distance < 50:
+            risk += (50 - distance) / 50 * 0.5
+    return min(risk, 1.0)
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def segment_risks(lat, lon, h, obstacle_lat, obstacle_lon):
+    """逐航段计算碰撞风险的编译内核"""
+    n_segments = max(lat.shape[0] - 1, 0)
+    risks = np.empty(n_segments)
+    for i in range(n_segments):
+        risks[i] = _segment_risk(lat, lon, h, i, obstacle_lat, obstacle_lon)
+    return risks
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def route_risks(lat, lon, h, obstacle_lat, obstacle_lon):
+    """
+    单次遍历航路点，同时算出各航段的碰撞风险与对地风险（各航路点风险的平均值），
+    每个航路点的坐标与高度只读取一次
+    """
+    n_points = lat.shape[0]
+    risks = np.empty(max(n_points - 1, 0))
+    ground_total = 0.0
+    for i in range(n_points):
+        density = SUBURB_DENSITY
+        if (DOWNTOWN_BOUNDS[0] <= lon[i] <= DOWNTOWN_BOUNDS[1] and
+                DOWNTOWN_BOUNDS[2] <= lat[i] <= DOWNTOWN_BOUNDS[3]):
+            density = DOWNTOWN_DENSITY
+        ground_total += density * math.exp(-h[i] / 100)
+        if i + 1 < n_points:
+            risks[i] = _segment_risk(lat, lon, h, i, obstacle_lat, obstacle_lon)
+    return risks, (ground_total / n_points if n_points > 0 else 0.0)
 
 class RouteOptimizer:
     """基于论文中的航路规划理论"""
@@ -18,143 +82,193 @@ class RouteOptimizer:
                             grid_size: float = 0.002,  # 约200米
                             altitude: float = 120) -> List[Dict]:
         """生成矩阵节点型航路（棋盘式）"""
-        path = []
+        path = self.generate_matrix_route_array(start, end, grid_size, altitude)
         
+        # 只在对外接口处转换为航路点字典列表
+        return [
+            {"longitude": lon, "latitude": lat, "height": altitude, "time": time}
+            for lon, lat, time in zip(path["lon"].tolist(), path["lat"].tolist(),
+                                      range(0, 60 * len(path), 60))
+        ]
+    
+    def generate_matrix_route_array(self, start: Tuple[float, float], end: Tuple[float, float],
+                                    grid_size: float = 0.002, altitude: float = 120) -> np.ndarray:
+        """矩阵节点型航路的结构化数组形式（WAYPOINT_DTYPE），可直接传给各项评估接口"""
         # 计算网格点
         lon_steps = int(abs(end[0] - start[0]) / grid_size) + 1
         lat_steps = int(abs(end[1] - start[1]) / grid_size) + 1
         
-        # 生成曼哈顿式路径
-        current_lon, current_lat = start
-        time_counter = 0
-        
-        # 先沿经度方向移动
-        for i in range(lon_steps):
-            lon = start[0] + i * grid_size * np.sign(end[0] - start[0])
-            path.append({
-                "longitude": lon,
-                "latitude": current_lat,
-                "height": altitude,
-                "time": time_counter
-            })
-            time_counter += 60
-        
-        # 再沿纬度方向移动
-        for j in range(1, lat_steps):
-            lat = start[1] + j * grid_size * np.sign(end[1] - start[1])
-            path.append({
-                "longitude": path[-1]["longitude"],  # 使用最后一个点的经度
-                "latitude": lat,
-                "height": altitude,
-                "time": time_counter
-            })
-            time_counter += 60
-            
+        # 经纬度方向的移动方向（1、-1 或 0），用Python整数避免生成0维数组
+        sx = 1 if end[0] > start[0] else (-1 if end[0] < start[0] else 0)
+        sy = 1 if end[1] > start[1] else (-1 if end[1] < start[1] else 0)
+        
+        # 生成曼哈顿式路径：先沿经度方向移动，再沿纬度方向移动
+        lons = start[0] + np.arange(lon_steps) * (grid_size * sx)
+        lats = start[1] + np.arange(1, lat_steps) * (grid_size * sy)
+        
+        count = lon_steps + lat_steps - 1
+        path = np.empty(count, dtype=WAYPOINT_DTYPE)
+        path["lon"][:lon_steps] = lons
+        path["lat"][:lon_steps] = start[1]
+        path["lon"][lon_steps:] = lons[-1]  # 使用最后一个点的经度
+        path["lat"][lon_steps:] = lats
+        path["h"] = altitude
+        path["t"] = np.arange(count) * 60
         return path
     
     def validate_route_safety(self, route: List[Dict], obstacles: List[Dict] = None) -> Dict:
-        """基于论文中的安全评估方法验证航路安全性"""
+        """基于论文中的安全评估方法验证航路安全性（route 也可以是 WAYPOINT_DTYPE 结构化数组）"""
         if obstacles is None:
             obstacles = []
             
-        safety_assessment = {
-            "collision_risk": 0.0,
-            "ground_risk": 0.0,
-            "total_risk": 0.0,
-            "safe_segments": [],
-            "risk_segments": [],
-            "is_safe": True
-        }
+        # 航路点很少时（如两三个点）构造数组的开销超过计算本身，直接逐点计算
+        if isinstance(route, list) and len(route) <= SMALL_ROUTE_POINTS:
+            return self._validate_small(route, obstacles)
+        
+        # 航路点坐标只转换一次数组，供各项风险计算复用
+        waypoints = to_route(route)
         
-        # 检查每个航段
+        # 各航段的碰撞风险与对地风险（基于论文公式）：有numba时在同一次遍历中算出，
+        # 整条航路都在高空时只算碰撞风险
+        if self._ground_risk_negligible(waypoints.h):
+            risks, ground_risk = self._calculate_segment_risks(waypoints, obstacles), 0.0
+        elif NUMBA_AVAILABLE:
+            risks, ground_risk = route_risks(waypoints.lat, waypoints.lon, waypoints.h,
+                                             *self._obstacle_arrays(obstacles))
+        else:
+            risks = self._calculate_segment_risks(waypoints, obstacles)
+            ground_risk = self._calculate_ground_risk(waypoints)
+        
+        safe = risks < 0.3  # 安全阈值
+        return self._summarize_safety(
+            float(risks.mean()) if len(risks) > 0 else 0.0, float(ground_risk),
+            np.flatnonzero(safe).tolist(), np.flatnonzero(~safe).tolist()
+        )
+    
+    def validate_routes_safety(self, routes: List, obstacles: List[Dict] = None,
+                               max_workers: int = None) -> List[Dict]:
+        """
+        并行验证多条航路的安全性，结果顺序与输入一致
+        各航路互不相关；编译内核执行时释放GIL（nogil），用线程池即可利用多核
+        """
+        if len(routes) <= 1:
+            return [self.validate_route_safety(route, obstacles) for route in routes]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda route: self.validate_route_safety(route, obstacles), routes))
+    
+    def _validate_small(self, route: List[Dict], obstacles: List[Dict]) -> Dict:
+        """
+        少量航路点的安全评估：与数组路径相同的模型，用Python标量与 math 函数逐点计算，
+        不调用编译内核，省去每次调用的分派开销
+        """
+        safe_segments, risk_segments = [], []
+        collision_total = 0.0
         for i in range(len(route) - 1):
-            segment_risk = self._calculate_segment_risk(
-                route[i], route[i+1], obstacles
-            )
+            point1, point2 = route[i], route[i + 1]
             
-            if segment_risk < 0.3:  # 安全阈值
-                safety_assessment["safe_segments"].append(i)
-            else:
-                safety_assessment["risk_segments"].append(i)
-                
-            safety_assessment["collision_risk"] += segment_risk
+            # 基于高度的基础风险 + 50米安全距离内的障碍物风险
+            avg_height = (point1["height"] + point2["height"]) / 2
+            risk = 0.2 if avg_height < 50 else (0.1 if avg_height < 100 else 0.0)
             
-        # 平均碰撞风险
-        if len(route) > 1:
-            safety_assessment["collision_risk"] /= (len(route) - 1)
+            # 障碍物到航段的最短距离：投影到局部平面后求垂足并限制在航段内
+            vx = (point2["longitude"] - point1["longitude"]) * DEG2M_LON
+            vy = (point2["latitude"] - point1["latitude"]) * DEG2M
+            seg_len2 = vx * vx + vy * vy
+            for obstacle in obstacles:
+                wx = (obstacle.get("longitude", 0) - point1["longitude"]) * DEG2M_LON
+                wy = (obstacle.get("latitude", 0) - point1["latitude"]) * DEG2M
+                t = min(max((vx * wx + vy * wy) / seg_len2, 0.0), 1.0) if seg_len2 > 0 else 0.0
+                distance = math.hypot(wx - t * vx, wy - t * vy)
+                if distance < 50:
+                    risk += (50 - distance) / 50 * 0.5
+            risk = min(risk, 1.0)
             
-        # 计算对地风险（基于论文公式）
-        safety_assessment["ground_risk"] = self._calculate_ground_risk(route)
+            (safe_segments if risk < 0.3 else risk_segments).append(i)
+            collision_total += risk
         
-        # 总风险评估
-        safety_assessment["total_risk"] = (
-            safety_assessment["collision_risk"] * 0.6 + 
-            safety_assessment["ground_risk"] * 0.4
-        )
+        min_lon, max_lon, min_lat, max_lat = DOWNTOWN_BOUNDS
+        ground_total = 0.0
+        high_altitude = bool(route) and min(point["height"] for point in route) > NEGLIGIBLE_GROUND_RISK_HEIGHT
+        for point in ([] if high_altitude else route):
+            downtown = (min_lon <= point["longitude"] <= max_lon and
+                        min_lat <= point["latitude"] <= max_lat)
+            density = DOWNTOWN_DENSITY if downtown else SUBURB_DENSITY
+            ground_total += density * math.exp(-point["height"] / 100)
         
-        # 判断是否安全
-        safety_assessment["is_safe"] = safety_assessment["total_risk"] < 0.5
+        return self._summarize_safety(
+            collision_total / (len(route) - 1) if len(route) > 1 else 0.0,
+            ground_total / len(route) if route else 0.0,
+            safe_segments, risk_segments
+        )
+    
+    def _summarize_safety(self, collision_risk: float, ground_risk: float,
+                          safe_segments: List[int], risk_segments: List[int]) -> Dict:
+        """汇总碰撞风险与对地风险，得到总风险与安全结论"""
+        # 总风险评估
+        total_risk = collision_risk * 0.6 + ground_risk * 0.4
         
-        return safety_assessment
+        return {
+            "collision_risk": collision_risk,
+            "ground_risk": ground_risk,
+            "total_risk": total_risk,
+            "safe_segments": safe_segments,
+            "risk_segments": risk_segments,
+            "is_safe": total_risk < 0.5  # 判断是否安全
+        }
     
-    def _calculate_segment_risk(self, point1: Dict, point2: Dict, 
-                               obstacles: List[Dict]) -> float:
-        """计算航段碰撞风险"""
-        # 简化的风险计算
-        risk = 0.0
-        
-        # 基于高度的基础风险
-        avg_height = (point1["height"] + point2["height"]) / 2
-        if avg_height < 50:
-            risk += 0.2  # 低空飞行风险较高
-        elif avg_height < 100:
-            risk += 0.1
-            
-        # 障碍物风险（如果有障碍物数据）
-        for obstacle in obstacles:
-            min_distance = self._point_to_line_distance(
-                obstacle, point1, point2
+    def _calculate_segment_risks(self, waypoints, obstacles: List[Dict]) -> np.ndarray:
+        """计算各航段的碰撞风险（简化模型），返回长度为航段数的数组"""
+        obstacle_lat, obstacle_lon = self._obstacle_arrays(obstacles)
+        
+        # 有numba时由编译内核逐航段计算，不生成 航段 × 障碍物 的中间数组
+        if NUMBA_AVAILABLE and len(obstacle_lat) > 0:
+            return segment_risks(waypoints.lat, waypoints.lon, waypoints.h, obstacle_lat, obstacle_lon)
+        
+        # 基于高度的基础风险：低空飞行风险较高
+        avg_height = (waypoints.h[:-1] + waypoints.h[1:]) / 2
+        risk = np.select([avg_height < 50, avg_height < 100], [0.2, 0.1], default=0.0)
+        
+        # 障碍物风险（如果有障碍物数据）：航段 × 障碍物 广播计算距离
+        if len(obstacle_lat) > 0:
+            # 障碍物到航段的最短距离：投影到局部平面后求垂足，线段中部的最近点也能计入
+            min_distance = point_to_segment_distance_np(
+                obstacle_lat[None, :], obstacle_lon[None, :],
+                waypoints.lat[:-1, None], waypoints.lon[:-1, None],
+                waypoints.lat[1:, None], waypoints.lon[1:, None]
             )
-            if min_distance < 50:  # 50米安全距离
-                risk += (50 - min_distance) / 50 * 0.5
+            # 50米安全距离内按距离线性增加风险
+            risk = risk + (np.clip(50 - min_distance, 0, None) / 50 * 0.5).sum(axis=1)
                 
-        return min(risk, 1.0)
-    
-    def _calculate_ground_risk(self, route: List[Dict]) -> float:
-        """基于论文公式计算对地风险"""
-        total_risk = 0.0
+            return np.minimum(risk, 1.0)
         
-        for point in route:
-            # 基于高度的风险衰减
-            height_factor = math.exp(-point["height"] / 100)
-            
-            # 简化的人口密度估算（实际应用中应使用真实数据）
-            # 广州市中心区域人口密度较高
-            if 113.32 <= point["longitude"] <= 113.33 and 23.11 <= point["latitude"] <= 23.14:
-                population_density = 0.8  # 市中心
-            else:
-                population_density = 0.4  # 其他区域
-            
-            # 使用论文中的公式简化版
-            point_risk = population_density * height_factor
-            total_risk += point_risk
-            
-        return total_risk / len(route) if route else 0
+        # 没有障碍物时只有高度基础风险，不超过1，无需再截断
+        return risk
     
-    def _point_to_line_distance(self, point: Dict, 
-                               line_start: Dict, 
-                               line_end: Dict) -> float:
-        """计算点到线段的最短距离（简化版）"""
-        # 这里使用简化的曼哈顿距离
-        # 实际应用中应该使用更精确的计算方法
-        
-        # 点到线段起点的距离
-        dist1 = abs(point.get("longitude", 0) - line_start["longitude"]) + \
-                abs(point.get("latitude", 0) - line_start["latitude"])
-        
-        # 点到线段终点的距离  
-        dist2 = abs(point.get("longitude", 0) - line_end["longitude"]) + \
-                abs(point.get("latitude", 0) - line_end["latitude"])
-        
-        # 返回较小值（米为单位，1度约等于111000米）
-        return min(dist1, dist2) * 111000
+    def _obstacle_arrays(self, obstacles: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """障碍物坐标转换为 (纬度数组, 经度数组)"""
+        obstacle_lat = np.array([obstacle.get("latitude", 0) for obstacle in obstacles], dtype=np.float64)
+        obstacle_lon = np.array([obstacle.get("longitude", 0) for obstacle in obstacles], dtype=np.float64)
+        return obstacle_lat, obstacle_lon
+    
+    def _ground_risk_negligible(self, heights: np.ndarray) -> bool:
+        """航路最低点是否高于 NEGLIGIBLE_GROUND_RISK_HEIGHT（含NaN高度时为否）"""
+        return len(heights) > 0 and bool(heights.min() > NEGLIGIBLE_GROUND_RISK_HEIGHT)
+    
+    def _calculate_ground_risk(self, route) -> float:
+        """基于论文公式计算对地风险（route 为航路点字典列表或Route数组结构）"""
+        waypoints = to_route(route)
+        if len(waypoints.h) == 0 or self._ground_risk_negligible(waypoints.h):
+            return 0
+        
+        # 基于高度的风险衰减，在同一个数组上原地计算
+        point_risk = np.divide(waypoints.h, -100)
+        np.exp(point_risk, out=point_risk)
+        
+        # 市中心区域人口密度较高，其他区域较低
+        min_lon, max_lon, min_lat, max_lat = DOWNTOWN_BOUNDS
+        downtown = ((waypoints.lon >= min_lon) & (waypoints.lon <= max_lon) &
+                    (waypoints.lat >= min_lat) & (waypoints.lat <= max_lat))
+        point_risk *= np.where(downtown, DOWNTOWN_DENSITY, SUBURB_DENSITY)
+        
+        # 使用论文中的公式简化版，各航路点风险取平均
+        return float(point_risk.mean())
@@ -1,6 +1,23 @@
 import unittest
+import gzip
+import json
+import math
+import tempfile
+import numpy as np
+import main
+from geo_utils import WAYPOINT_DTYPE
 from route_optimizer import RouteOptimizer
 from airspace_capacity import AirspaceCapacityAnalyzer
+from ground_risk_evaluator import (DEFAULT_POPULATION_DENSITY, GroundRiskEvaluator,
+                                   population_density_at, population_density_np, risk_levels_np)
+
+def _route_arr(points):
+    """
+    航路点 (经度, 纬度, 高度[, 时间]) 转为 WAYPOINT_DTYPE 结构化数组，直接走接口的数组路径；
+    各评估接口同时接受结构化数组与航路点字典列表，缺省的时间记为NaN
+    """
+    return np.array([tuple(point) + (np.nan,) * (4 - len(point)) for point in points],
+                    dtype=WAYPOINT_DTYPE)
 
 class TestRouteOptimization(unittest.TestCase):
     
@@ -26,14 +43,32 @@ class TestRouteOptimization(unittest.TestCase):
             self.assertIn("height", route[i])
             
         print(f"生成了 {len(route)} 个航路点")
+
+    def test_matrix_route_array(self):
+        """测试矩阵型航路的结构化数组形式可直接用于安全评估与容量计算"""
+        start, end = (113.32, 23.11), (113.33, 23.14)
+        waypoints = self.optimizer.generate_matrix_route_array(start, end)
+        route = self.optimizer.generate_matrix_route(start, end)
+
+        self.assertEqual(waypoints.dtype, WAYPOINT_DTYPE)
+        self.assertEqual(waypoints["lon"].tolist(), [p["longitude"] for p in route])
+        self.assertEqual(waypoints["lat"].tolist(), [p["latitude"] for p in route])
+
+        # 数组与字典列表两种输入的评估结果一致
+        self.assertEqual(self.optimizer.validate_route_safety(waypoints),
+                         self.optimizer.validate_route_safety(route))
+        self.assertEqual(self.analyzer.calculate_route_capacity(waypoints),
+                         self.analyzer.calculate_route_capacity(route))
+
+        print(f"结构化数组航路: {len(waypoints)} 个航路点")
         
     def test_capacity_calculation(self):
         """测试容量计算"""
-        test_route = [
-            {"longitude": 113.32, "latitude": 23.11, "height": 100, "time": 0},
-            {"longitude": 113.33, "latitude": 23.12, "height": 100, "time": 60},
-            {"longitude": 113.34, "latitude": 23.13, "height": 100, "time": 120},
-        ]
+        test_route = _route_arr([
+            (113.32, 23.11, 100, 0),
+            (113.33, 23.12, 100, 60),
+            (113.34, 23.13, 100, 120),
+        ])
         
         capacity = self.analyzer.calculate_route_capacity(test_route)
         
@@ -48,10 +83,10 @@ class TestRouteOptimization(unittest.TestCase):
         
     def test_safety_assessment(self):
         """测试安全评估"""
-        test_route = [
-            {"longitude": 113.32, "latitude": 23.11, "height": 50, "time": 0},
-            {"longitude": 113.33, "latitude": 23.12, "height": 100, "time": 60},
-        ]
+        test_route = _route_arr([
+            (113.32, 23.11, 50, 0),
+            (113.33, 23.12, 100, 60),
+        ])
         
         safety = self.optimizer.validate_route_safety(test_route)
         
@@ -66,17 +101,32 @@ class TestRouteOptimization(unittest.TestCase):
         
         print(f"安全评估: {safety}")
         
+    def test_batch_safety_assessment(self):
+        """测试多条航路的并行安全评估与逐条评估结果一致"""
+        routes = [
+            self.optimizer.generate_matrix_route_array((113.32, 23.11), (113.33, 23.14), altitude=altitude)
+            for altitude in (40, 80, 120, 200, 600)
+        ]
+
+        results = self.optimizer.validate_routes_safety(routes)
+
+        self.assertEqual(results, [self.optimizer.validate_route_safety(route) for route in routes])
+        # 高于500米的航路对地风险可忽略，记为0
+        self.assertEqual(results[-1]["ground_risk"], 0.0)
+
+        print(f"并行安全评估: {[result['total_risk'] for result in results]}")
+
     def test_conflict_analysis(self):
         """测试冲突分析"""
         routes = [
-            [
-                {"longitude": 113.32, "latitude": 23.11, "height": 100},
-                {"longitude": 113.33, "latitude": 23.12, "height": 100},
-            ],
-            [
-                {"longitude": 113.31, "latitude": 23.12, "height": 100},
-                {"longitude": 113.34, "latitude": 23.11, "height": 100},
-            ]
+            _route_arr([
+                (113.32, 23.11, 100),
+                (113.33, 23.12, 100),
+            ]),
+            _route_arr([
+                (113.31, 23.12, 100),
+                (113.34, 23.11, 100),
+            ])
         ]
         
         conflict_prob = self.analyzer.analyze_conflict_probability(routes, 5)
@@ -87,5 +137,246 @@ class TestRouteOptimization(unittest.TestCase):
         
         print(f"冲突概率: {conflict_prob}")
 
+    def test_route_intersections(self):
+        """测试航段交叉检测（交点不在航路点上）"""
+        east_west = [
+            {"longitude": 113.30, "latitude": 23.12, "height": 120},
+            {"longitude": 113.34, "latitude": 23.12, "height": 120},
+        ]
+        north_south = [
+            {"longitude": 113.315, "latitude": 23.10, "height": 120},
+            {"longitude": 113.315, "latitude": 23.125, "height": 120},
+        ]
+        parallel = [
+            {"longitude": 113.30, "latitude": 23.13, "height": 120},
+            {"longitude": 113.34, "latitude": 23.13, "height": 120},
+        ]
+
+        intersections = self.analyzer._find_route_intersections(
+            [east_west, north_south, parallel]
+        )
+
+        # 只有东西向与南北向航路相交，交点位于两条航段中间
+        self.assertEqual(len(intersections), 1)
+        self.assertEqual((intersections[0]["route1"], intersections[0]["route2"]), (0, 1))
+        self.assertAlmostEqual(intersections[0]["location"]["longitude"], 113.315, places=6)
+        self.assertAlmostEqual(intersections[0]["location"]["latitude"], 23.12, places=6)
+
+        print(f"航路交叉点: {intersections}")
+
+    def test_obstacle_near_segment_middle(self):
+        """测试障碍物靠近航段中部（远离两端航路点）时计入碰撞风险"""
+        test_route = [
+            {"longitude": 113.30, "latitude": 23.12, "height": 120, "time": 0},
+            {"longitude": 113.34, "latitude": 23.12, "height": 120, "time": 60},
+        ]
+        obstacles = [{"longitude": 113.32, "latitude": 23.1201}]  # 距航段约11米
+
+        safety = self.optimizer.validate_route_safety(test_route, obstacles)
+
+        self.assertGreater(safety["collision_risk"], 0.3)
+        self.assertEqual(safety["risk_segments"], [0])
+
+        print(f"航段中部障碍物: {safety}")
+
+class TestNoiseGrid(unittest.TestCase):
+
+    def setUp(self):
+        # 珠江新城附近约 0.6km × 0.8km 的地面网格与一组随机的无人机位置
+        rng = np.random.default_rng(0)
+        self.lons = 113.320 + np.arange(12) * 0.0005
+        self.lats = 23.110 + np.arange(15) * 0.0005
+        self.droneLons = rng.uniform(113.318, 113.328, 30)
+        self.droneLats = rng.uniform(23.108, 23.120, 30)
+        self.droneHeights = rng.uniform(30, 200, 30)
+        self.cosLat0 = math.cos(math.radians(self.lats.mean()))
+
+    def _reference(self):
+        """逐个网格点、逐个无人机位置用标量函数计算 (最后一个位置的衰减, 最小衰减, 最大衰减)"""
+        shape = (len(self.lons), len(self.lats))
+        last, lowest, highest = np.empty(shape), np.full(shape, np.inf), np.full(shape, -np.inf)
+        for i, lon in enumerate(self.lons):
+            for j, lat in enumerate(self.lats):
+                for droneLon, droneLat, droneHeight in zip(self.droneLons, self.droneLats, self.droneHeights):
+                    last[i, j] = main.calculateNoiseAtPoint(droneLat, droneLon, droneHeight, lat, lon)
+                    lowest[i, j] = min(lowest[i, j], last[i, j])
+                    highest[i, j] = max(highest[i, j], last[i, j])
+        return last, lowest, highest
+
+    def test_grid_matches_point_reference(self):
+        """测试噪声网格与逐点标量计算一致（平面近似与单精度误差在0.02dB内）"""
+        result = main.calculateNoiseGrid(self.droneLons, self.droneLats, self.droneHeights,
+                                         self.lons, self.lats, self.cosLat0)
+
+        reference = self._reference()
+        for actual, expected in zip(result, reference):
+            np.testing.assert_allclose(actual, expected, atol=0.02)
+
+        print(f"噪声网格最大误差: {max(np.abs(a - e).max() for a, e in zip(result, reference))}")
+
+    def test_numba_matches_numpy(self):
+        """测试编译内核与NumPy实现的噪声网格一致"""
+        kx = main.DEG2M * self.cosLat0
+        groundX = ((self.lons - self.lons[0]) * kx).astype(main.NOISE_DTYPE)
+        groundY = ((self.lats - self.lats[0]) * main.DEG2M).astype(main.NOISE_DTYPE)
+        droneX = ((self.droneLons - self.lons[0]) * kx).astype(main.NOISE_DTYPE)
+        droneY = ((self.droneLats - self.lats[0]) * main.DEG2M).astype(main.NOISE_DTYPE)
+        droneHeights = self.droneHeights.astype(main.NOISE_DTYPE)
+
+        # 块大小取得很小，覆盖NumPy实现的分块累计
+        kernel = main.grid_noise(droneX, droneY, droneHeights, groundX, groundY)
+        fallback = main.calculateNoiseGridNumPy(droneX, droneY, droneHeights, groundX, groundY, 1000)
+
+        for actual, expected in zip(kernel, fallback):
+            np.testing.assert_allclose(actual, expected, atol=1e-3)
+
+        print(f"编译内核与NumPy实现一致: {kernel[0].shape}")
+
+    def test_geojson_matches_point_reference(self):
+        """测试噪声GeoJSON各要素的噪声值与逐点标量计算一致（远离航路的网格点也不截断）"""
+        route = main.FLIGHT_ROUTES[4]
+        geojson = main.generateNoiseGeoJSON(route, 200)
+
+        path = route['path']
+        positions = [
+            tuple(point[key] + t / 10 * (nextPoint[key] - point[key]) for key in ('latitude', 'longitude', 'height'))
+            for point, nextPoint in zip(path[:-1], path[1:]) for t in range(11)
+        ]
+        for feature in geojson['features']:
+            lon, lat = feature['geometry']['coordinates']
+            noises = [route['base_noise'] - main.calculateNoiseAtPoint(*position, lat, lon) for position in positions]
+            properties = feature['properties']
+            self.assertAlmostEqual(properties['noise'], noises[-1], delta=0.02)
+            self.assertAlmostEqual(properties['minNoise'], min(noises), delta=0.02)
+            self.assertAlmostEqual(properties['maxNoise'], max(noises + [route['base_noise']]), delta=0.02)
+
+        print(f"噪声GeoJSON: {len(geojson['features'])} 个要素")
+
+    def test_noise_cache_and_payload(self):
+        """测试热力图的npz磁盘缓存与预先序列化、压缩的响应体"""
+        cacheDir = main.NOISE_CACHE_DIR
+        with tempfile.TemporaryDirectory() as tmp:
+            main.NOISE_CACHE_DIR = tmp
+            try:
+                computed = main._noise_cached.__wrapped__(4, 200)
+                loaded = main._noise_cached.__wrapped__(4, 200)
+                body, compressed = main._noise_payload.__wrapped__(4, 200)
+            finally:
+                main.NOISE_CACHE_DIR = cacheDir
+
+        # 从磁盘缓存读回的数据与首次计算的结果相同
+        self.assertEqual(loaded, computed)
+        self.assertEqual(gzip.decompress(compressed), body)
+        self.assertEqual(len(json.loads(body)['points']), len(computed['points']))
+
+        print(f"热力图缓存: {len(computed['points'])} 个点")
+
+    def test_accepts_gzip(self):
+        """测试按 Accept-Encoding 的q值协商gzip压缩"""
+        self.assertTrue(main.acceptsGzip('gzip, deflate, br'))
+        self.assertTrue(main.acceptsGzip('br;q=1.0, gzip;q=0.8'))
+        self.assertTrue(main.acceptsGzip('*'))
+        self.assertFalse(main.acceptsGzip(''))
+        self.assertFalse(main.acceptsGzip('gzip;q=0'))
+        self.assertFalse(main.acceptsGzip('identity, gzip;q=0.0, *;q=1'))
+        self.assertFalse(main.acceptsGzip('deflate'))
+
+        print("gzip协商: 通过")
+
+class TestGroundRiskEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = GroundRiskEvaluator()
+
+    def test_batch_matches_scalar(self):
+        """测试批量评估与逐点评估的各项指标一致（市中心内外、典型与随机高度、各无人机类型）"""
+        rng = np.random.default_rng(0)
+        heights = np.concatenate(([0, 50, 100, 500] * 2, rng.uniform(0, 600, 40)))
+        lons = np.concatenate(([113.30] * 4 + [113.40] * 4, rng.uniform(113.20, 113.40, 40)))
+        lats = np.concatenate(([23.12] * 4 + [23.05] * 4, rng.uniform(23.05, 23.20, 40)))
+
+        for uav_type in ("small", "medium", "large", "unknown"):
+            batch = self.evaluator.evaluate_ground_risk_batch(heights, lons, lats, uav_type)
+            points = [
+                self.evaluator.evaluate_ground_risk(
+                    {"height": height, "longitude": lon, "latitude": lat}, uav_type)
+                for height, lon, lat in zip(heights.tolist(), lons.tolist(), lats.tolist())
+            ]
+            for key, values in batch.items():
+                expected = np.array([point[key] for point in points])
+                if values.dtype.kind == "f":
+                    np.testing.assert_allclose(values, expected, rtol=1e-12, atol=0, err_msg=key)
+                else:
+                    np.testing.assert_array_equal(values, expected, err_msg=key)
+
+        print(f"批量对地风险评估: {len(heights)} 个位置 × 4 种无人机类型")
+
+    def test_population_density_regions(self):
+        """测试人口密度查询取第一个包含该点的分区，都不包含时为郊区密度（标量与向量化一致）"""
+        regions = (
+            (113.30, 113.34, 23.10, 23.14, 0.02),
+            (113.20, 113.40, 23.00, 23.20, 0.005),
+        )
+        lons = [113.32, 113.25, 113.50]
+        lats = [23.12, 23.05, 23.12]
+        expected = [0.02, 0.005, DEFAULT_POPULATION_DENSITY]
+
+        self.assertEqual([population_density_at(lon, lat, regions) for lon, lat in zip(lons, lats)], expected)
+        self.assertEqual(population_density_np(lons, lats, regions).tolist(), expected)
+
+        print(f"人口密度分区: {expected}")
+
+    def test_risk_level_boundaries(self):
+        """测试风险等级在阈值处的划分（阈值本身属于更高一级，NaN为最高级），标量与向量化一致"""
+        scores = [0.0999, 0.1, 0.3, 0.6, float("nan")]
+        expected = ["LOW", "MEDIUM", "HIGH", "CRITICAL", "CRITICAL"]
+
+        self.assertEqual([self.evaluator._get_risk_level(score) for score in scores], expected)
+        self.assertEqual(risk_levels_np(np.array(scores)).tolist(), expected)
+
+        print(f"风险等级边界: {dict(zip(scores, expected))}")
+
+    def test_cache_follows_uav_params(self):
+        """测试修改无人机参数后缓存不返回旧结果"""
+        position = {"height": 10, "longitude": 113.30, "latitude": 23.12}
+        before = self.evaluator.evaluate_ground_risk(position)
+
+        self.evaluator.UAV_PARAMS["medium"]["weight"] = 5
+        after = self.evaluator.evaluate_ground_risk(position)
+
+        self.assertAlmostEqual(before["severity_score"], 0.245)
+        self.assertAlmostEqual(after["severity_score"], 0.049)
+
+        print(f"修改参数后的严重度: {before['severity_score']} -> {after['severity_score']}")
+
+    def test_numpy_scalar_positions(self):
+        """测试位置坐标为NumPy标量或0维数组时与Python浮点数结果相同"""
+        expected = self.evaluator.evaluate_ground_risk({"height": 80.0, "longitude": 113.30, "latitude": 23.12})
+
+        for convert in (np.float64, np.array):
+            position = {"height": convert(80.0), "longitude": convert(113.30), "latitude": convert(23.12)}
+            self.assertEqual(self.evaluator.evaluate_ground_risk(position), expected)
+
+        print(f"NumPy坐标: {expected['total_risk']}")
+
+    def test_cached_matches_uncached(self):
+        """测试命中缓存的评估结果与不经缓存的计算一致"""
+        rng = np.random.default_rng(2)
+        positions = [{"height": float(height), "longitude": float(lon), "latitude": float(lat)}
+                     for height, lon, lat in zip(rng.choice([0, 50, 100, 120], 20),
+                                                 rng.uniform(113.20, 113.40, 20), rng.uniform(23.05, 23.20, 20))]
+
+        first = [self.evaluator.evaluate_ground_risk(position, "large") for position in positions]
+        second = [self.evaluator.evaluate_ground_risk(position, "large") for position in positions]
+        self.assertEqual(self.evaluator._evaluate_cached.cache_info().hits, len(positions))
+        self.evaluator.clear_cache()
+        uncached = [self.evaluator.evaluate_ground_risk(position, "large") for position in positions]
+
+        self.assertEqual(first, second)
+        self.assertEqual(second, uncached)
+        self.assertEqual(self.evaluator._evaluate_cached.cache_info().hits, 0)
+
+        print(f"缓存一致性: {len(positions)} 个位置")
+
 if __name__ == '__main__':
     unittest.main()